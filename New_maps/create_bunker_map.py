@@ -4,45 +4,81 @@ Generates 6 distinct Scene Assets:
 - Scene 1 (Surface): 5 Floors (4 Above Ground + 1 Ground/Entrance)
 - Scene 2-5 (Underground): 10 Floors each
 - Scene 6 (Deep): 5 Floors
+
+Usage:
+    python New_maps/create_bunker_map.py            # Generate all scenes
+    python New_maps/create_bunker_map.py --watch    # Re-render affected scenes on save
+    python New_maps/create_bunker_map.py --export-layers  # Bare scenes + object placement JSON
+    python New_maps/create_bunker_map.py --tiers    # Also write 0.25x resolution tiers
+    python New_maps/create_bunker_map.py --png-only # Skip the WebP variants (compress_scenes.py owns them)
+    python New_maps/create_bunker_map.py --tiles    # Also write streamable tile pyramids (New_maps/tiles/)
 """
 
-from PIL import Image, ImageDraw
-import numpy as np
 import os
+import sys
 import json
+import hashlib
+import time
 
 # --- LOAD SHARED GRID CONFIG ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 config_path = os.path.join(project_root, "grid_config.json")
 
-with open(config_path, 'r') as f:
-    GRID_CONFIG = json.load(f)
-
-# Extract values from shared config
-FLOOR_HEIGHT_PX = GRID_CONFIG['floor']['effectiveHeight']
-VERTICAL_PADDING = GRID_CONFIG['floor']['verticalPadding']
-POS_PADDING_RATIO = GRID_CONFIG['grid']['positionPaddingRatio']
-GRID_SLOTS = GRID_CONFIG['grid']['slots']
-ASSET_SCALE_FACTOR = GRID_CONFIG['grid'].get('assetScaleFactor', 1.0)
-SLOT_SPACING_FACTOR = GRID_CONFIG['grid'].get('slotSpacingFactor', 1.0)  # <1.0 = tighter spacing
-ASSET_Y_OFFSETS = GRID_CONFIG.get('assetYOffsets', {})
-ASSET_X_OFFSETS = GRID_CONFIG.get('assetXOffsets', {})
-ASSET_SCALES = GRID_CONFIG.get('assetScales', {})
-
-# Scene-specific positioning
-SURFACE_FIRST_ROOM_Y = GRID_CONFIG['scenes']['surface']['firstRoomY']
-SURFACE_FLOOR_LINE_OFFSET = GRID_CONFIG['scenes']['surface']['floorLineOffset']
-SURFACE_ROOM_HEIGHT = GRID_CONFIG['scenes']['surface']['roomHeight']
-UNDERGROUND_FIRST_ROOM_Y = GRID_CONFIG['scenes']['underground']['firstRoomY']
-UNDERGROUND_FLOOR_LINE_OFFSET = GRID_CONFIG['scenes']['underground']['floorLineOffset']
-UNDERGROUND_ROOM_HEIGHT = GRID_CONFIG['scenes']['underground']['roomHeight']
-
-# AUTO-CALCULATE Y offset factor from floorLineOffset / roomHeight
-# This ensures assets and dev floor lines are always in sync!
-ROOM_Y_OFFSET_FACTOR = SURFACE_FLOOR_LINE_OFFSET / SURFACE_ROOM_HEIGHT
-
-print(f"Loaded grid config: FLOOR_HEIGHT={FLOOR_HEIGHT_PX}, Y_OFFSET_FACTOR={ROOM_Y_OFFSET_FACTOR:.3f} (auto-calculated)")
+# Shared pipeline helpers live at the project root
+sys.path.insert(0, project_root)
+from compress_scenes import encode_scene
+from lazy_import import lazy_import, preload
+from scene_tiles import TILE_DIR_NAME, describe_tiles, index_filename, prune_tiles, save_tile_pyramid
+from scene_variants import describe_variants, required_variants, variant_filename
+
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+np = lazy_import("numpy")
+
+def apply_grid_config(config):
+    """Sets the module-level layout values from a parsed grid_config.json (reloadable in watch mode)."""
+    global GRID_CONFIG, FLOOR_HEIGHT_PX, VERTICAL_PADDING, POS_PADDING_RATIO, GRID_SLOTS
+    global ASSET_SCALE_FACTOR, SLOT_SPACING_FACTOR, ASSET_Y_OFFSETS, ASSET_X_OFFSETS, ASSET_SCALES
+    global SURFACE_FIRST_ROOM_Y, SURFACE_FLOOR_LINE_OFFSET, SURFACE_ROOM_HEIGHT
+    global UNDERGROUND_FIRST_ROOM_Y, UNDERGROUND_FLOOR_LINE_OFFSET, UNDERGROUND_ROOM_HEIGHT
+    global ROOM_Y_OFFSET_FACTOR
+
+    GRID_CONFIG = config
+
+    # Extract values from shared config
+    FLOOR_HEIGHT_PX = GRID_CONFIG['floor']['effectiveHeight']
+    VERTICAL_PADDING = GRID_CONFIG['floor']['verticalPadding']
+    POS_PADDING_RATIO = GRID_CONFIG['grid']['positionPaddingRatio']
+    GRID_SLOTS = GRID_CONFIG['grid']['slots']
+    ASSET_SCALE_FACTOR = GRID_CONFIG['grid'].get('assetScaleFactor', 1.0)
+    SLOT_SPACING_FACTOR = GRID_CONFIG['grid'].get('slotSpacingFactor', 1.0)  # <1.0 = tighter spacing
+    ASSET_Y_OFFSETS = GRID_CONFIG.get('assetYOffsets', {})
+    ASSET_X_OFFSETS = GRID_CONFIG.get('assetXOffsets', {})
+    ASSET_SCALES = GRID_CONFIG.get('assetScales', {})
+
+    # Scene-specific positioning
+    SURFACE_FIRST_ROOM_Y = GRID_CONFIG['scenes']['surface']['firstRoomY']
+    SURFACE_FLOOR_LINE_OFFSET = GRID_CONFIG['scenes']['surface']['floorLineOffset']
+    SURFACE_ROOM_HEIGHT = GRID_CONFIG['scenes']['surface']['roomHeight']
+    UNDERGROUND_FIRST_ROOM_Y = GRID_CONFIG['scenes']['underground']['firstRoomY']
+    UNDERGROUND_FLOOR_LINE_OFFSET = GRID_CONFIG['scenes']['underground']['floorLineOffset']
+    UNDERGROUND_ROOM_HEIGHT = GRID_CONFIG['scenes']['underground']['roomHeight']
+
+    # AUTO-CALCULATE Y offset factor from floorLineOffset / roomHeight
+    # This ensures assets and dev floor lines are always in sync!
+    ROOM_Y_OFFSET_FACTOR = SURFACE_FLOOR_LINE_OFFSET / SURFACE_ROOM_HEIGHT
+
+    print(f"Loaded grid config: FLOOR_HEIGHT={FLOOR_HEIGHT_PX}, Y_OFFSET_FACTOR={ROOM_Y_OFFSET_FACTOR:.3f} (auto-calculated)")
+
+def load_grid_config():
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    apply_grid_config(config)
+    return config
+
+# Loaded by main(); importing the module (e.g. for SCENE_CONFIGS) stays side-effect free
+GRID_CONFIG = None
 
 # --- SCENE CONFIGS ---
 SCENE_CONFIGS = [
@@ -61,6 +97,9 @@ SCENE_CONFIGS = [
 # Layout Constants (derived from shared config)
 SEPARATOR_HEIGHT = 80
 
+# Scene list consumed by downstream tools (compress_scenes.py, etc.)
+SCENE_MANIFEST_NAME = "scenes_manifest.json"
+
 def remove_background_floodfill(image, threshold=150):
     """Remove contiguous white background using flood fill + pixel cleanup."""
     if image.mode != 'RGBA':
@@ -84,9 +123,10 @@ def remove_background_floodfill(image, threshold=150):
     
     return Image.fromarray(data)
 
-def place_object(composite, room_rect, asset_image, start_slot, slot_width_slots, asset_name="Unknown"):
+def compute_placement(room_rect, asset_image, start_slot, slot_width_slots, asset_name="Unknown"):
     """
-    Places an object into the scene composite at a specific room position and slot.
+    Computes where an object lands in a room.
+    Returns the placement: slot, slot width, scale, X/Y offsets and final pixel rect [x, y, w, h].
     Grid System: Uses shared config from grid_config.json
     """
     rx, ry, rw, rh = room_rect
@@ -153,249 +193,644 @@ def place_object(composite, room_rect, asset_image, start_slot, slot_width_slots
         print(f"     [OffsetApplied] {asset_name}: X={x_offset_px}px, Y={y_offset_px}px")
     print(f"     asset_size={target_w:.0f}x{target_h:.0f}, placed at ({draw_x}, {draw_y})")
     
+    return {
+        "assetKey": asset_key,
+        "slot": start_slot,
+        "slots": slot_width_slots,
+        "scale": final_scale_factor,
+        "xOffset": x_offset_px,
+        "yOffset": y_offset_px,
+        "rect": [draw_x, draw_y, int(target_w), int(target_h)]
+    }
+
+def place_object(composite, room_rect, asset_image, start_slot, slot_width_slots, asset_name="Unknown"):
+    """
+    Places an object into the scene composite at a specific room position and slot.
+    Grid System: Uses shared config from grid_config.json
+    """
+    draw_x, draw_y, w, h = compute_placement(room_rect, asset_image, start_slot, slot_width_slots, asset_name)['rect']
+    
     # Resize and Paste
-    asset_resized = asset_image.resize((int(target_w), int(target_h)), Image.Resampling.LANCZOS)
+    asset_resized = asset_image.resize((w, h), Image.Resampling.LANCZOS)
     composite.paste(asset_resized, (draw_x, draw_y), asset_resized)
 
 
 
-def generate_scene(scene_data, assets, output_dir):
-    """Generates a single scene image based on configuration."""
-    print(f"Generating {scene_data['name']}...")
-    
+def scene_layout(scene_data, assets):
+    """
+    Lays out a scene without drawing it.
+    Returns (base, layers): the background base and the ordered list of pastes,
+    each with the asset key it uses and its final pixel rect [x, y, w, h].
+    """
     # Unpack Assets
-    room_img = assets.get('normal_room_scaled', assets['normal_room'])
-    entrance_img = assets.get('entrance_scaled', assets['entrance'])
-    
+    room_key = 'normal_room_scaled' if 'normal_room_scaled' in assets else 'normal_room'
+    entrance_key = 'entrance_scaled' if 'entrance_scaled' in assets else 'entrance'
+    room_img = assets[room_key]
+    entrance_img = assets[entrance_key]
+    layers = []
+
+    def add_layer(name, asset_key, x, y, w, h):
+        layers.append({"name": name, "asset": asset_key, "rect": [x, y, w, h]})
+
     # 1. Setup Canvas & Background
-    full_bg = None
-    TARGET_WIDTH = 0
-    canvas_h = 0
-    
+    new_room_w, new_room_h = room_img.size
+    effective_floor_h = new_room_h + VERTICAL_PADDING
+    top_margin = 100
+    current_y = top_margin
+
     # Check for Cached Underground BG
     if scene_data['type'] == 'underground' and 'ug_bg_scaled' in assets:
-        # Use Cached Background (Clone it)
-        full_bg = assets['ug_bg_scaled'].copy()
-        TARGET_WIDTH, canvas_h = full_bg.size
-        
-        # Dimensions are pre-calculated
-        new_room_w, new_room_h = room_img.size
-        effective_floor_h = new_room_h + VERTICAL_PADDING
-        
-        top_margin = 100
-        current_y = top_margin
-        
-        # Room Center X
-        room_x = (TARGET_WIDTH - new_room_w) // 2
-        
+        # Use Cached Background (Clone it) - Dimensions are pre-calculated
+        TARGET_WIDTH, canvas_h = assets['ug_bg_scaled'].size
+        base = {"asset": 'ug_bg_scaled', "size": [TARGET_WIDTH, canvas_h]}
     else:
         # Surface or standard fallback
         bg_base = assets['background_city']
         TARGET_WIDTH = bg_base.width
-        
-        # Calculate Dimensions on the fly (if not cached, though we expect cached)
-        new_room_w, new_room_h = room_img.size
-        new_entrance_w, new_entrance_h = entrance_img.size
-        
-        effective_floor_h = new_room_h + VERTICAL_PADDING
-        
-        num_floors = scene_data['floors']
-        total_content_height = (num_floors * effective_floor_h)
+        total_content_height = (scene_data['floors'] * effective_floor_h)
         canvas_h = max(bg_base.height, total_content_height + 500)
-        
-        # Create Canvas
-        full_bg = Image.new('RGBA', (TARGET_WIDTH, canvas_h), (30, 25, 20, 255))
-        full_bg.paste(bg_base, (0, 0))
-        
-        top_margin = 100
-        current_y = top_margin
-        
-        room_x = (TARGET_WIDTH - new_room_w) // 2
-        
+        base = {"asset": 'background_city', "size": [TARGET_WIDTH, canvas_h]}
+
+    # Room Center X
+    room_x = (TARGET_WIDTH - new_room_w) // 2
+
     # 2. Place Floors
     if scene_data['type'] == 'surface':
         start_y = 600
         new_entrance_w, new_entrance_h = entrance_img.size
         entrance_x = (TARGET_WIDTH - new_entrance_w) // 2
-        
+
+        def add_object(asset_key, pos_y, start_slot, slot_width_slots, asset_name):
+            placement = compute_placement((room_x, pos_y, new_room_w, new_room_h), assets[asset_key],
+                                          start_slot, slot_width_slots, asset_name)
+            add_layer(asset_name, asset_key, *placement['rect'])
+            layers[-1]["placement"] = dict(placement, floor=i)
+
         for i in range(scene_data['floors']):
             is_ground_floor = (i == scene_data['floors'] - 1)
-            
+            pos_y = start_y + (i * effective_floor_h)
+
             if is_ground_floor:
                 # Place Entrance
-                pos_y = start_y + (i * effective_floor_h)
-                full_bg.paste(entrance_img, (entrance_x, pos_y), entrance_img)
-            else:
-                # Place Normal Room
-                pos_y = start_y + (i * effective_floor_h)
-                full_bg.paste(room_img, (room_x, pos_y), room_img)
-                
-                # Objects (Same logic as before)
-                if i == 0:
-                    # if 'garden' in assets:
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 0, 2, "Plant 1")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 2, 2, "Plant 2")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 4, 2, "Plant 3")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 6, 2, "Plant 4")
-                    pass
-                if i == 1:
-                    # if 'garden' in assets:
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 0, 2, "Plant 1")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 2, 2, "Plant 2")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 4, 2, "Plant 3")
-                    if 'water_purifier' in assets:
-                         place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['water_purifier'], 6, 2, "Water Purifier")
-                if i == 2:
-                    if 'scrap_machine' in assets:
-                         place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['scrap_machine'], 0, 4, "Scrap Machine")
-                    # if 'garden' in assets:
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 4, 2, "Plant 1")
-                    #      place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['garden'], 6, 2, "Plant 2")
-                if i == 3:
-                     if 'scrap_machine' in assets:
-                         place_object(full_bg, (room_x, pos_y, new_room_w, new_room_h), assets['scrap_machine'], 0, 4, "Scrap Machine")
+                add_layer("Entrance", entrance_key, entrance_x, pos_y, new_entrance_w, new_entrance_h)
+                continue
+
+            # Place Normal Room
+            add_layer(f"Room {i}", room_key, room_x, pos_y, new_room_w, new_room_h)
 
+            # Objects (garden plants are rendered in-game as a spritesheet, not baked)
+            if i == 1:
+                if 'water_purifier' in assets:
+                    add_object('water_purifier', pos_y, 6, 2, "Water Purifier")
+            if i == 2:
+                if 'scrap_machine' in assets:
+                    add_object('scrap_machine', pos_y, 0, 4, "Scrap Machine")
+            if i == 3:
+                if 'scrap_machine' in assets:
+                    add_object('scrap_machine', pos_y, 0, 4, "Scrap Machine")
     else:
-        # Underground
+        # Underground - Already resized cached room
         for i in range(scene_data['floors']):
-            # Already resized cached room
-            full_bg.paste(room_img, (room_x, current_y), room_img)
+            add_layer(f"Room {i}", room_key, room_x, current_y, new_room_w, new_room_h)
             current_y += effective_floor_h
 
+    return base, layers
+
+def scene_base_image(base, assets):
+    """Creates the background canvas for a scene."""
+    if base['asset'] == 'ug_bg_scaled':
+        return assets['ug_bg_scaled'].copy()
+    # Create Canvas
+    canvas = Image.new('RGBA', tuple(base['size']), (30, 25, 20, 255))
+    canvas.paste(assets['background_city'], (0, 0))
+    return canvas
+
+def dirty_bands(old_layers, new_layers, canvas_h):
+    """
+    Returns merged [(y0, y1), ...] row bands covering every layer that was added,
+    removed or moved, or None when the change cannot be expressed as bands (reordering).
+    """
+    old_keys = [(l['source'], tuple(l['rect'])) for l in old_layers]
+    new_keys = [(l['source'], tuple(l['rect'])) for l in new_layers]
+    if old_keys == new_keys:
+        return []
+    changed = set(old_keys) ^ set(new_keys)
+    if not changed:
+        return None
+
+    spans = sorted((max(0, y), min(canvas_h, y + h)) for _, (x, y, w, h) in changed)
+    bands = [list(spans[0])]
+    for y0, y1 in spans[1:]:
+        if y0 <= bands[-1][1]:
+            bands[-1][1] = max(bands[-1][1], y1)
+        else:
+            bands.append([y0, y1])
+    return [(y0, y1) for y0, y1 in bands if y1 > y0]
+
+def layers_path(scene_data, output_dir):
+    return os.path.join(output_dir, f"scene_{scene_data['id']}_layers.json")
+
+def layout_digest(meta):
+    """Identity of a scene render: base and layers, each with its source content hash."""
+    return hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()[:16]
+
+def load_layer_metadata(scene_data, output_dir):
+    try:
+        with open(layers_path(scene_data, output_dir), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_outputs(scene_data, output_dir, names, digest, meta=None):
+    """
+    Records in the layer metadata that output files `names` were rendered from
+    layout `digest`. `meta` (the layout plus PNG stat) is only passed when the
+    PNG itself was written, so base/layers keep describing the PNG on disk.
+    """
+    data = load_layer_metadata(scene_data, output_dir)
+    if meta is not None:
+        data.update(meta)
+    data['outputs'] = dict(data.get('outputs', {}), **{name: digest for name in names})
+    with open(layers_path(scene_data, output_dir), 'w') as f:
+        json.dump(data, f, indent=2)
+
+def load_previous_scene(scene_data, output_dir):
+    """Loads the last saved PNG + layer metadata if they still match each other."""
+    meta_path = layers_path(scene_data, output_dir)
+    png_path = os.path.join(output_dir, f"scene_{scene_data['id']}.png")
+    if not (os.path.exists(meta_path) and os.path.exists(png_path)):
+        return None
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        st = os.stat(png_path)
+        if meta.get('png') != {"mtime": st.st_mtime, "bytes": st.st_size}:
+            return None
+        return {"meta": meta, "image": Image.open(png_path).convert('RGBA'), "layer_images": {}}
+    except Exception:
+        return None
+
+def generate_scene(scene_data, assets, output_dir, save_png=True, previous=None, tiers=False, tiles=False, save_webp=True):
+    """
+    Generates a single scene image based on configuration.
+    When a previous render of the scene is available (in memory or on disk),
+    only the row bands touched by changed layers are recomposited.
+    With `tiers`, a 0.25x resolution tier is written next to the full and 0.5x variants.
+    With `tiles`, the scene is also cut into a tile pyramid (see scene_tiles.py).
+    Without `save_webp`, only the PNG (and tiles) are written.
+    Returns the render state to pass as `previous` next time.
+    """
+    print(f"Generating {scene_data['name']}...")
+
+    base, layers = scene_layout(scene_data, assets)
+    hashes = assets['source_hashes']
+    base["source"] = hashes[base['asset']]
+    for layer in layers:
+        layer["source"] = hashes[layer['asset']]
+    meta = {"base": base, "layers": layers}
+
+    if previous is None:
+        previous = load_previous_scene(scene_data, output_dir)
+
+    # Resized layers are reused across renders when the source and size are unchanged
+    layer_images = previous["layer_images"] if previous else {}
+    def layer_image(layer):
+        x, y, w, h = layer['rect']
+        img = assets[layer['asset']]
+        if img.size == (w, h):
+            return img
+        key = (layer['source'], w, h)
+        if key not in layer_images:
+            layer_images[key] = img.resize((w, h), Image.Resampling.LANCZOS)
+        return layer_images[key]
+
+    canvas_w, canvas_h = base['size']
+    bands = None
+    if previous and previous['meta']['base'] == base:
+        bands = dirty_bands(previous['meta']['layers'], layers, canvas_h)
+
+    # Output sets, each skipped only if every file exists and was rendered from this exact layout
+    # (a --png-only run or watch mode can leave the others behind a newer layout)
+    stem = f"scene_{scene_data['id']}"
+    digest = layout_digest(meta)
+    outputs = {}
+    if save_png:
+        outputs['png'] = [f"{stem}.png"]
+    if save_webp:
+        outputs['webp'] = [variant_filename(stem, v) for v in required_variants(tiers)]
+    if tiles:
+        outputs['tiles'] = [f"{TILE_DIR_NAME}/{index_filename(stem)}"]
+    rendered = load_layer_metadata(scene_data, output_dir).get('outputs', {})
+    stale = {kind for kind, names in outputs.items()
+             if not all(rendered.get(name) == digest and os.path.exists(os.path.join(output_dir, name))
+                        for name in names)}
+
+    if bands == [] and not stale:
+        print(f"Unchanged: {stem}")
+        return {"meta": previous['meta'], "image": previous['image'], "layer_images": layer_images}
+
+    if bands == []:
+        # Layout unchanged but an output is missing or stale: re-encode the previous render
+        print(f"Re-encoding {stem}: " + ", ".join(sorted(stale)))
+        full_bg = previous['image']
+    elif bands is None:
+        # Full render
+        full_bg = scene_base_image(base, assets)
+        for layer in layers:
+            img = layer_image(layer)
+            full_bg.paste(img, tuple(layer['rect'][:2]), img)
+    else:
+        # Dirty-region recomposition: rebuild each band from the base and the layers crossing it
+        full_bg = previous['image'].copy()
+        base_img = scene_base_image(base, assets)
+        for y0, y1 in bands:
+            band = base_img.crop((0, y0, canvas_w, y1))
+            for layer in layers:
+                x, y, w, h = layer['rect']
+                if y < y1 and y + h > y0:
+                    img = layer_image(layer)
+                    band.paste(img, (x, y - y0), img)
+            full_bg.paste(band, (0, y0))
+        print(f"Recomposited {len(bands)} band(s): " + ", ".join(f"rows {y0}-{y1}" for y0, y1 in bands))
+    if bands != []:
+        stale = set(outputs)
+
     # Save
-    # Save as PNG (High Quality Source)
-    output_filename_png = f"scene_{scene_data['id']}.png"
-    output_path_png = os.path.join(output_dir, output_filename_png)
-    full_bg.save(output_path_png, compress_level=1)
-    
-    # Save as WebP (Game Ready Asset)
-    output_filename_webp = f"scene_{scene_data['id']}.webp"
-    output_path_webp = os.path.join(output_dir, output_filename_webp)
-    full_bg.save(output_path_webp, format='WEBP', quality=85)
-    
-    print(f"Saved: {output_filename_png} & {output_filename_webp}")
+    # Save as PNG (High Quality Source) - skipped in watch mode for fast iteration
+    output_filename_png = f"{stem}.png"
+    png_meta = None
+    if 'png' in stale:
+        output_path_png = os.path.join(output_dir, output_filename_png)
+        full_bg.save(output_path_png, compress_level=1)
 
-def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    
-    # Paths
-    paths = {
+        # Layer metadata always describes the PNG on disk
+        st = os.stat(output_path_png)
+        png_meta = dict(meta, png={"mtime": st.st_mtime, "bytes": st.st_size})
+    
+    # Save as WebP (Game Ready Asset) + half-res and placeholder variants from the same image
+    output_filename_webp = f"{stem}.webp"
+    if 'webp' in stale:
+        encode_scene(full_bg, output_dir, stem, tiers=tiers)
+    if 'tiles' in stale:
+        save_tile_pyramid(full_bg, output_dir, stem, quality=85)
+    record_outputs(scene_data, output_dir, [name for kind in stale for name in outputs[kind]], digest, png_meta)
+    
+    if 'png' in stale and 'webp' in stale:
+        print(f"Saved: {output_filename_png} & {output_filename_webp}")
+    elif stale & {'png', 'webp'}:
+        print(f"Saved: {output_filename_png if 'png' in stale else output_filename_webp}")
+
+    return {"meta": meta, "image": full_bg, "layer_images": layer_images}
+
+LAYERED_DIR_NAME = "layered"
+
+def export_layered(assets, output_dir):
+    """
+    Layered export: bare room/background scenes plus a placement JSON per scene.
+    Objects are not baked; the game draws them as sprites from the placements,
+    which use exactly the place_object math. Identical bare scenes share one image,
+    and a bare image is only re-encoded when its own layers change.
+    """
+    layered_dir = os.path.join(output_dir, LAYERED_DIR_NAME)
+    os.makedirs(layered_dir, exist_ok=True)
+    paths = source_paths()
+    written = {}
+
+    for scene_data in SCENE_CONFIGS:
+        print(f"Exporting {scene_data['name']} (layered)...")
+        base, layers = scene_layout(scene_data, assets)
+        rooms = [l for l in layers if 'placement' not in l]
+        objects = [l for l in layers if 'placement' in l]
+
+        # Bare scene identity: background + room layers (objects excluded)
+        hashes = assets['source_hashes']
+        bare_key = hashlib.sha1(json.dumps(
+            [hashes[base['asset']], base['size']] + [[hashes[l['asset']], l['rect']] for l in rooms]
+        ).encode()).hexdigest()[:16]
+
+        if bare_key not in written:
+            bare_name = f"scene_{scene_data['id']}_bare.webp"
+            bare_path = os.path.join(layered_dir, bare_name)
+            placements_path = os.path.join(layered_dir, f"scene_{scene_data['id']}_placements.json")
+            previous = {}
+            if os.path.exists(placements_path):
+                with open(placements_path, 'r') as f:
+                    previous = json.load(f)
+            if previous.get('bareKey') == bare_key and os.path.exists(bare_path):
+                print(f"Unchanged: {bare_name}")
+            else:
+                canvas = scene_base_image(base, assets)
+                for layer in rooms:
+                    img = assets[layer['asset']]
+                    canvas.paste(img, tuple(layer['rect'][:2]), img)
+                canvas.save(bare_path, format='WEBP', quality=85)
+                print(f"Saved: {bare_name}")
+            written[bare_key] = bare_name
+
+        # Keyed object sprites, content-addressed so unchanged sprites are written once
+        for l in objects:
+            texture_name = f"{l['asset']}_{hashes[l['asset']][:8]}.png"
+            texture_path = os.path.join(layered_dir, texture_name)
+            if not os.path.exists(texture_path):
+                assets[l['asset']].save(texture_path)
+                print(f"Saved: {texture_name}")
+            l['texture'] = texture_name
+
+        placements = {
+            "scene": scene_data['id'],
+            "name": scene_data['name'],
+            "image": written[bare_key],
+            "bareKey": bare_key,
+            "size": base['size'],
+            "objects": [
+                {
+                    "name": l['name'],
+                    "asset": l['asset'],
+                    "texture": l['texture'],
+                    "source": os.path.relpath(paths[l['asset']], project_root).replace(os.sep, '/'),
+                    "floor": l['placement']['floor'],
+                    "slot": l['placement']['slot'],
+                    "slots": l['placement']['slots'],
+                    "scale": l['placement']['scale'],
+                    "xOffset": l['placement']['xOffset'],
+                    "yOffset": l['placement']['yOffset'],
+                    "rect": dict(zip(("x", "y", "width", "height"), l['rect']))
+                }
+                for l in objects
+            ]
+        }
+        with open(os.path.join(layered_dir, f"scene_{scene_data['id']}_placements.json"), 'w') as f:
+            json.dump(placements, f, indent=2)
+
+    print(f"Layered export saved to: {layered_dir}")
+
+def write_scene_manifest(output_dir):
+    """Writes the scene list so downstream tools discover scenes instead of hardcoding them."""
+    manifest = {
+        "scenes": [
+            {
+                "id": config['id'],
+                "name": config['name'],
+                "type": config['type'],
+                "floors": config['floors'],
+                "png": f"scene_{config['id']}.png",
+                "webp": f"scene_{config['id']}.webp",
+                "variants": describe_variants(output_dir, f"scene_{config['id']}"),
+                "tiles": describe_tiles(output_dir, f"scene_{config['id']}")
+            }
+            for config in SCENE_CONFIGS
+        ]
+    }
+    manifest_path = os.path.join(output_dir, SCENE_MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Scene manifest saved: {manifest_path}")
+
+def source_paths():
+    """Source images used by the generator, keyed by asset role."""
+    return {
         'bg_city': os.path.join(script_dir, "background_city.png"),
         'normal_room': os.path.join(script_dir, "image.png"),
         'entrance': os.path.join(script_dir, "image copy.png"),
-        'dirt': os.path.join(script_dir, "underground_dirt.png")
+        'dirt': os.path.join(script_dir, "underground_dirt.png"),
+        # Paths relative to project root - using updated asset versions
+        'scrap_machine': os.path.join(project_root, "Objects", "Machines", "scrap-v3.png"),
+        'water_purifier': os.path.join(project_root, "Objects", "WaterPurifier", "water_purifier_v2_1769543600142.png"),
     }
-    
-    # Load Assets Once
+
+# Scene types that must be re-rendered when a source image changes
+SOURCE_SCENE_TYPES = {
+    'bg_city': {'surface', 'underground'},  # Defines canvas size for all scenes
+    'normal_room': {'surface', 'underground'},
+    'entrance': {'surface'},
+    'dirt': {'underground'},
+    'scrap_machine': {'surface'},
+    'water_purifier': {'surface'},
+}
+
+# Scene types affected by each grid_config.json section (objects are only placed on the surface)
+CONFIG_SCENE_TYPES = {
+    'grid': {'surface'},
+    'assetYOffsets': {'surface'},
+    'assetXOffsets': {'surface'},
+    'assetScales': {'surface'},
+    'scenes': {'surface'},
+}
+
+def image_digest(img):
+    """Short content hash of a decoded image."""
+    return hashlib.sha1(img.tobytes()).hexdigest()[:16]
+
+def cached_step(cache, key, deps, fn):
+    """
+    Memoizes an expensive asset step in `cache` (kept warm across watch iterations).
+    `deps` is a tuple of source mtimes; the step reruns only when they change.
+    """
+    hit = cache.get(key)
+    if hit is not None and hit[0] == deps:
+        return hit[1]
+    value = fn()
+    cache[key] = (deps, value)
+    return value
+
+def load_assets(cache=None):
+    """Loads, keys and pre-scales all assets. Pass a persistent `cache` dict to reuse work."""
+    if cache is None:
+        cache = {}
+    paths = source_paths()
+    mtimes = {k: (os.path.getmtime(p) if os.path.exists(p) else None) for k, p in paths.items()}
+
+    def load_keyed(key):
+        return remove_background_floodfill(Image.open(paths[key]).convert('RGBA'))
+
     assets = {}
     print("Loading Base Assets...")
-    
-    try:
-        # Background
+
+    # Background - Upscale immediately to define canvas width standard
+    def load_background():
         bg = Image.open(paths['bg_city']).convert('RGBA')
-        # Upscale Background immediately to define canvas width standard
         bg_w, bg_h = bg.size
-        assets['background_city'] = bg.resize((bg_w * 3, bg_h * 3), Image.Resampling.LANCZOS)
-        
-        # Dirt
-        dt = Image.open(paths['dirt']).convert('RGBA')
-        assets['dirt_texture'] = dt # Will be resized in generator
-        
-        # Rooms (Strip Backgrounds)
-        print("Processing Room Assets (Chroma Key)...")
-        entr = Image.open(paths['entrance']).convert('RGBA')
-        assets['entrance'] = remove_background_floodfill(entr)
-        
-        norm = Image.open(paths['normal_room']).convert('RGBA')
-        assets['normal_room'] = remove_background_floodfill(norm)
-        
-        # Load Objects (Machines)
-        print("Loading Object Assets...")
-        # Paths relative to project root - using updated asset versions
-        obj_scrap_path = os.path.join(project_root, "Objects", "Machines", "scrap-v3.png")
-        if os.path.exists(obj_scrap_path):
-            try:
-                img = Image.open(obj_scrap_path).convert('RGBA')
-                assets['scrap_machine'] = remove_background_floodfill(img)
-            except: pass
-            
-        obj_water_path = os.path.join(project_root, "Objects", "WaterPurifier", "water_purifier_v2_1769543600142.png")
-        if os.path.exists(obj_water_path):
-            try:
-                img = Image.open(obj_water_path).convert('RGBA')
-                assets['water_purifier'] = remove_background_floodfill(img)
-            except: pass
-
-        # obj_garden_path = os.path.join(project_root, "Objects", "Cutscenes", "Garden", "download (31).mp4")
-        # if os.path.exists(obj_garden_path):
-        #     if obj_garden_path.endswith('.mp4'):
-        #         print(f"Video asset detected for Garden: {obj_garden_path} - Skipping static bake.")
-        #         # parsed_assets['garden'] will remain unset, so it won't be drawn
-        #     else:
-        #         try:
-        #             img = Image.open(obj_garden_path).convert('RGBA')
-        #             assets['garden'] = remove_background_floodfill(img)
-        #         except: pass
-            
-        
-    except Exception as e:
-        print(f"Failed to load assets: {e}")
-        return
+        return bg.resize((bg_w * 3, bg_h * 3), Image.Resampling.LANCZOS)
+    assets['background_city'] = cached_step(cache, 'background_city', (mtimes['bg_city'],), load_background)
+
+    # Dirt - Will be resized in pre-processing
+    assets['dirt_texture'] = cached_step(
+        cache, 'dirt_texture', (mtimes['dirt'],), lambda: Image.open(paths['dirt']).convert('RGBA'))
+
+    # Rooms (Strip Backgrounds)
+    print("Processing Room Assets (Chroma Key)...")
+    assets['entrance'] = cached_step(cache, 'entrance', (mtimes['entrance'],), lambda: load_keyed('entrance'))
+    assets['normal_room'] = cached_step(cache, 'normal_room', (mtimes['normal_room'],), lambda: load_keyed('normal_room'))
+
+    # Load Objects (Machines)
+    print("Loading Object Assets...")
+    for key in ('scrap_machine', 'water_purifier'):
+        if mtimes[key] is None:
+            continue
+        try:
+            assets[key] = cached_step(cache, key, (mtimes[key],), lambda key=key: load_keyed(key))
+        except Exception as e:
+            print(f"Failed to load {key}: {e}")
+
+    # obj_garden_path = os.path.join(project_root, "Objects", "Cutscenes", "Garden", "download (31).mp4")
+    # Video asset for Garden - skipped for static bake (rendered as a spritesheet in-game)
 
     # Pre-Process Common Assets to avoid redundant resizing
     print("Pre-processing Shared Assets...")
-    
+
     # Calculate Standard Dimensions (based on Surface/Scene 1 logic which defines scale)
     # We assume usage of Background City width
     ref_bg_width = assets['background_city'].width
-    
+
     # Calculate Scaled Room Dimensions (Same for all scenes)
-    room_w, room_h = assets['normal_room'].size
-    scale_factor = (ref_bg_width * 0.70) / room_w
-    new_room_w = int(room_w * scale_factor)
-    new_room_h = int(room_h * scale_factor)
-    assets['normal_room_scaled'] = assets['normal_room'].resize((new_room_w, new_room_h), Image.Resampling.LANCZOS)
-    
-    entrance_w, entrance_h = assets['entrance'].size
-    entrance_scale = (ref_bg_width * 0.70) / entrance_w
-    new_entrance_w = int(entrance_w * entrance_scale)
-    new_entrance_h = int(entrance_h * entrance_scale)
-    assets['entrance_scaled'] = assets['entrance'].resize((new_entrance_w, new_entrance_h), Image.Resampling.LANCZOS)
-    
+    def scale_to_width(img):
+        w, h = img.size
+        scale_factor = (ref_bg_width * 0.70) / w
+        return img.resize((int(w * scale_factor), int(h * scale_factor)), Image.Resampling.LANCZOS)
+
+    assets['normal_room_scaled'] = cached_step(
+        cache, 'normal_room_scaled', (mtimes['normal_room'], mtimes['bg_city']),
+        lambda: scale_to_width(assets['normal_room']))
+    assets['entrance_scaled'] = cached_step(
+        cache, 'entrance_scaled', (mtimes['entrance'], mtimes['bg_city']),
+        lambda: scale_to_width(assets['entrance']))
+
     # Pre-calculate Underground Background (Shared by Scenes 2-10)
-    # They all have 5 floors
-    ug_floors = 5
-    vertical_padding = VERTICAL_PADDING
-    effective_floor_h = new_room_h + vertical_padding
-    
     # Underground Height Calculation - MATCH SURFACE BACKGROUND HEIGHT
     # Use the same dimensions as the surface background for consistent zoom
     surface_bg_w, surface_bg_h = assets['background_city'].size
-    
-    print(f"Pre-generating Underground Background ({surface_bg_w}x{surface_bg_h}) - matching surface...")
-    
+
     # Simply stretch the dirt texture to match surface dimensions exactly
     # This avoids tiling artifacts/seams
-    dirt_tex = assets['dirt_texture']
-    assets['ug_bg_scaled'] = dirt_tex.resize((surface_bg_w, surface_bg_h), Image.Resampling.LANCZOS)
+    assets['ug_bg_scaled'] = cached_step(
+        cache, 'ug_bg_scaled', (mtimes['dirt'], mtimes['bg_city']),
+        lambda: assets['dirt_texture'].resize((surface_bg_w, surface_bg_h), Image.Resampling.LANCZOS))
     assets['ug_dims'] = (surface_bg_w, surface_bg_h) # Cache dims
 
-    # Generate Layouts in Parallel
-    print("\nStarting Parallel Generation...")
-    
+    # Content hashes of every layer source, recorded in the per-scene layer metadata
+    layer_sources = {
+        'background_city': ('bg_city',), 'ug_bg_scaled': ('dirt', 'bg_city'),
+        'normal_room': ('normal_room',), 'normal_room_scaled': ('normal_room', 'bg_city'),
+        'entrance': ('entrance',), 'entrance_scaled': ('entrance', 'bg_city'),
+        'scrap_machine': ('scrap_machine',), 'water_purifier': ('water_purifier',),
+    }
+    assets['source_hashes'] = {
+        key: cached_step(cache, f'hash:{key}', tuple(mtimes[d] for d in deps), lambda key=key: image_digest(assets[key]))
+        for key, deps in layer_sources.items() if key in assets
+    }
+
+    return assets
+
+def generate_scenes(configs, assets, output_dir, save_png=True, previous=None, tiers=False, tiles=False, save_webp=True):
+    """Generates scenes in parallel. Returns {scene_id: render state} for incremental re-renders."""
     import concurrent.futures
     
+    previous = previous or {}
+    renders = {}
+    # Worker threads must not be the first to touch a lazy module (see lazy_import.py)
+    preload("numpy", "PIL.Image", "PIL.ImageDraw", "PIL.ImageFilter")
     with concurrent.futures.ThreadPoolExecutor() as executor:
         # Submit all tasks
-        futures = [executor.submit(generate_scene, config, assets, script_dir) for config in SCENE_CONFIGS]
+        futures = {
+            executor.submit(generate_scene, config, assets, output_dir, save_png, previous.get(config['id']), tiers, tiles, save_webp): config['id']
+            for config in configs
+        }
         
         # Wait for completion
         for future in concurrent.futures.as_completed(futures):
             try:
-                future.result()
+                renders[futures[future]] = future.result()
             except Exception as e:
                 print(f"Scene generation failed: {e}")
+    return renders
+
+def watch(interval=0.25):
+    """
+    Long-running watch mode for live tuning.
+    Keeps decoded and keyed assets resident and re-renders only the scenes
+    affected by a changed source image or grid_config.json section.
+    """
+    cache = {}
+    watched = dict(source_paths(), grid_config=config_path)
+
+    def snapshot():
+        return {k: (os.path.getmtime(p) if os.path.exists(p) else None) for k, p in watched.items()}
+
+    config = GRID_CONFIG
+    assets = load_assets(cache)
+    renders = generate_scenes(SCENE_CONFIGS, assets, script_dir, save_png=False)
+    last = snapshot()
+    print(f"\nWatching {len(watched)} files (Ctrl+C to stop)...")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            changed = [k for k in watched if current[k] != last[k]]
+            if not changed:
+                continue
+            last = current
+
+            scene_types = set()
+            for key in changed:
+                if key == 'grid_config':
+                    try:
+                        new_config = load_grid_config()
+                    except ValueError as e:
+                        print(f"Invalid grid_config.json, waiting for next save: {e}")
+                        continue
+                    for section in set(new_config) | set(config):
+                        if new_config.get(section) != config.get(section):
+                            scene_types |= CONFIG_SCENE_TYPES.get(section, {'surface', 'underground'})
+                    config = new_config
+                else:
+                    scene_types |= SOURCE_SCENE_TYPES[key]
+
+            affected = [c for c in SCENE_CONFIGS if c['type'] in scene_types]
+            if not affected:
+                continue
+
+            start = time.time()
+            print(f"\nChanged: {', '.join(changed)} -> re-rendering {len(affected)} scene(s)")
+            try:
+                assets = load_assets(cache)
+            except Exception as e:
+                print(f"Failed to load assets: {e}")
+                continue
+            renders.update(generate_scenes(affected, assets, script_dir, save_png=False, previous=renders))
+            print(f"Done in {time.time() - start:.2f}s")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+def main():
+    load_grid_config()
+
+    if '--watch' in sys.argv[1:]:
+        watch()
+        return
+
+    # Load Assets Once
+    try:
+        assets = load_assets()
+    except Exception as e:
+        print(f"Failed to load assets: {e}")
+        return
+
+    if '--export-layers' in sys.argv[1:]:
+        export_layered(assets, script_dir)
+        return
+
+    # Generate Layouts in Parallel
+    print("\nStarting Parallel Generation...")
+    tiles = '--tiles' in sys.argv[1:]
+    generate_scenes(SCENE_CONFIGS, assets, script_dir, tiers='--tiers' in sys.argv[1:], tiles=tiles,
+                    save_webp='--png-only' not in sys.argv[1:])
+    if tiles:
+        removed = prune_tiles(script_dir)
+        if removed:
+            print(f"Pruned {removed} unreferenced tile(s)")
+
+    write_scene_manifest(script_dir)
 
 if __name__ == "__main__":
     main()
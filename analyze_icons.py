@@ -1,72 +1,39 @@
+"""
+Icon Hue Classifier
+Classifies icons by dominant hue and maps them to resource categories.
+
+RGB->HSV conversion and bucket histograms are vectorized with NumPy.
+Results are cached by file content hash, so re-running over an unchanged
+directory only hashes files. Writes a JSON index (icon -> resource) that the
+game can load with `this.load.json(...)`, plus the icon_map.txt report.
+
+Icons the game already binds to a resource (RESOURCE_OVERRIDES) keep that
+resource. Every other icon is classified on its own: it gets a resource only
+when its dominant hue beats the runner-up by MIN_MARGIN. A resource already
+taken by an override is not reassigned, and when several icons land on the
+same resource only the best-scoring one keeps it; the rest stay null.
+
+Usage:
+    python analyze_icons.py [dir_or_file ...] [--json ui_icons/icon_index.json]
+"""
+import argparse
 import os
-from PIL import Image
-import colorsys
 
-def get_dominant_hue(image_path):
-    try:
-        img = Image.open(image_path)
-        img = img.resize((100, 100))
-        img = img.convert('RGBA')
-        
-        hue_buckets = {
-            "Red/Orange": 0, # 0-45, 315-360
-            "Yellow": 0,     # 45-90
-            "Green": 0,      # 90-150
-            "Cyan": 0,       # 150-195
-            "Blue": 0,       # 195-255
-            "Purple": 0,     # 255-315
-            "Pink": 0        # (part of red/purple boundary)
-        }
-        
-        valid_pixels = 0
-        
-        for r, g, b, a in img.getdata():
-            if a < 128: continue # Skip transparent
-            
-            # Normalize 0-1
-            r_n, g_n, b_n = r/255.0, g/255.0, b/255.0
-            h, s, v = colorsys.rgb_to_hsv(r_n, g_n, b_n)
-            
-            # Skip low saturation (grey/white/black)
-            if s < 0.15: continue
-            # Skip very dark
-            if v < 0.2: continue
-            
-            h_deg = h * 360
-            
-            if 330 <= h_deg or h_deg < 45:
-                hue_buckets["Red/Orange"] += 1
-            elif 45 <= h_deg < 80: # Narrower yellow window
-                hue_buckets["Yellow"] += 1
-            elif 80 <= h_deg < 160:
-                hue_buckets["Green"] += 1
-            elif 160 <= h_deg < 200:
-                hue_buckets["Cyan"] += 1
-            elif 200 <= h_deg < 260:
-                hue_buckets["Blue"] += 1
-            elif 260 <= h_deg < 330:
-                hue_buckets["Purple"] += 1
-                
-            valid_pixels += 1
-
-        if valid_pixels == 0:
-            return "Grey/White", 0
-            
-        best_bucket = max(hue_buckets, key=hue_buckets.get)
-        confidence = hue_buckets[best_bucket] / valid_pixels
-        
-        return best_bucket, confidence
-
-    except Exception as e:
-        return f"Error: {e}", 0
-
-files = [
-    "Removal-279.png",
-    "Removal-913.png",
-    "06508040-6bbb-4dc7-8382-78993f04ef3a_removalai_preview.png",
-    "3c1eaa1c-03d1-4e95-b28f-d6b28fb84dd6_removalai_preview.png",
-    "998c8cbb-17a3-488b-b6cf-b4eddbdb80e1_removalai_preview.png"
-]
+from asset_cache import file_sha256, load_json, save_json
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+CACHE_NAME = ".icon_hue_cache.json"
+CACHE_VERSION = 3
+MIN_MARGIN = 0.3
+# Fewer colored pixels than this (of the 100x100 sample) classify as Grey/White
+MIN_COLORED_PIXELS = 100
+
+# Bucket upper edges in degrees; hues >= 330 wrap back into Red/Orange
+HUE_EDGES = (45, 80, 160, 200, 260, 330)
+HUE_BUCKETS = ["Red/Orange", "Yellow", "Green", "Cyan", "Blue", "Purple", "Red/Orange"]
 
 # Mapping based on hue
 # Caps -> Green
@@ -74,19 +41,193 @@ files = [
 # Water -> Blue/Cyan
 # Energy -> Yellow
 # Materials -> Purple
+HUE_TO_RESOURCE = {
+    "Green": "caps",
+    "Red/Orange": "food",
+    "Blue": "water",
+    "Cyan": "water",
+    "Yellow": "power",
+    "Purple": "materials",
+}
+
+# Icons with a known resource, as bound in src/systems/DynamicResourceBars.js.
+# The resource icons share one blue panel, so their hue alone cannot tell them apart.
+RESOURCE_OVERRIDES = {
+    "icon_cash": "caps",
+    "icon_food": "food",
+    "icon_water": "water",
+    "icon_energy": "power",
+    "icon_materials": "materials",
+}
+
+
+def rgb_to_hsv(rgb):
+    """Vectorized colorsys.rgb_to_hsv. `rgb` is (..., 3) float in 0-1; hue returned in degrees."""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = rgb.max(axis=-1)
+    minc = rgb.min(axis=-1)
+    delta = maxc - minc
+
+    v = maxc
+    s = np.divide(delta, maxc, out=np.zeros_like(maxc), where=maxc > 0)
+
+    safe = np.where(delta > 0, delta, 1)
+    rc = (maxc - r) / safe
+    gc = (maxc - g) / safe
+    bc = (maxc - b) / safe
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(delta > 0, (h / 6.0) % 1.0, 0.0)
+
+    return h * 360.0, s, v
+
+
+def get_dominant_hue(image_path):
+    """(bucket, share of colored pixels, lead over the runner-up bucket's share)."""
+    img = Image.open(image_path)
+    img = img.resize((100, 100))
+    img = img.convert('RGBA')
+    data = np.asarray(img, dtype=np.float32)
+
+    # Skip transparent
+    opaque = data[:, :, 3] >= 128
+    h_deg, s, v = rgb_to_hsv(data[:, :, :3] / 255.0)
+
+    # Skip low saturation (grey/white/black) and very dark
+    valid = opaque & (s >= 0.15) & (v >= 0.2)
+    valid_pixels = int(valid.sum())
+
+    if valid_pixels < MIN_COLORED_PIXELS:
+        return "Grey/White", 0, 0
+
+    counts = np.bincount(np.searchsorted(HUE_EDGES, h_deg[valid], side='right'),
+                         minlength=len(HUE_BUCKETS))
+    hue_buckets = {}
+    for name, count in zip(HUE_BUCKETS, counts):
+        hue_buckets[name] = hue_buckets.get(name, 0) + int(count)
+
+    best_bucket, runner_up = sorted(hue_buckets, key=hue_buckets.get, reverse=True)[:2]
+    confidence = hue_buckets[best_bucket] / valid_pixels
+    margin = confidence - hue_buckets[runner_up] / valid_pixels
+
+    return best_bucket, confidence, margin
 
-print(f"{'File':<60} | {'Detected Hue':<15} | {'Confidence'}")
-print("-" * 100)
 
-with open("icon_map.txt", "w", encoding="utf-8") as out:
-    out.write(f"{'File':<60} | {'Detected Hue':<15} | {'Confidence'}\n")
-    out.write("-" * 100 + "\n")
-    
+def collect_images(targets):
+    """Expands directories into their PNG/WebP files."""
+    files = []
+    for target in targets:
+        if os.path.isdir(target):
+            for name in sorted(os.listdir(target)):
+                if name.lower().endswith(('.png', '.webp')):
+                    files.append(os.path.join(target, name))
+        else:
+            files.append(target)
+    return files
+
+
+def classify_files(files, cache):
+    """Classifies files, reusing cached results for unchanged content."""
+    results = {}
     for f in files:
-        if os.path.exists(f):
-            hue, conf = get_dominant_hue(f)
-            line = f"{f:<60} | {hue:<15} | {conf:.2f}\n"
+        if not os.path.exists(f):
+            results[f] = None
+            continue
+        digest = file_sha256(f)
+        entry = cache.get(digest)
+        if entry is None:
+            try:
+                hue, conf, margin = get_dominant_hue(f)
+            except Exception as e:
+                # Not cached, so the file is retried on the next run
+                results[f] = {"hue": f"Error: {e}", "confidence": 0.0, "margin": 0.0}
+                continue
+            entry = {"hue": hue, "confidence": round(float(conf), 4), "margin": round(float(margin), 4)}
+            cache[digest] = entry
+        results[f] = entry
+    return results
+
+
+def icon_key(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def classify_resource(entry):
+    """Resource for one icon's classification on its own, or None when the hue lead is too small."""
+    if entry["margin"] < MIN_MARGIN:
+        return None
+    return HUE_TO_RESOURCE.get(entry["hue"])
+
+
+def assign_resources(results, overrides=RESOURCE_OVERRIDES):
+    """
+    {file: resource or None}. Overridden icons keep their resource; of the
+    other icons classified onto a resource no override holds, the one with
+    the largest hue margin (then confidence) keeps it.
+    """
+    overridden = {f for f, entry in results.items() if entry is not None and icon_key(f) in overrides}
+    resources = {f: overrides[icon_key(f)] if f in overridden else classify_resource(entry)
+                 for f, entry in results.items() if entry is not None}
+
+    taken = {resources[f] for f in overridden}
+    candidates = sorted((f for f, resource in resources.items()
+                         if f not in overridden and resource is not None and resource not in taken),
+                        key=lambda f: (-results[f]["margin"], -results[f]["confidence"], f))
+    winners = {}
+    for f in candidates:
+        winners.setdefault(resources[f], f)
+    return {f: resource if f in overridden or winners.get(resource) == f else None
+            for f, resource in resources.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify icons by dominant hue.")
+    parser.add_argument("targets", nargs="*", default=["ui_icons"], help="Directories or image files")
+    parser.add_argument("--json", default=None, help="JSON index output (default: <first dir>/icon_index.json)")
+    parser.add_argument("--report", default="icon_map.txt", help="Text report output")
+    args = parser.parse_args()
+
+    files = collect_images(args.targets)
+    base_dir = args.targets[0] if os.path.isdir(args.targets[0]) else os.path.dirname(args.targets[0]) or "."
+    json_path = args.json or os.path.join(base_dir, "icon_index.json")
+    cache_path = os.path.join(base_dir, CACHE_NAME)
+
+    cache = load_json(cache_path)
+    if cache.get("version") != CACHE_VERSION:
+        cache = {"version": CACHE_VERSION, "entries": {}}
+    results = classify_files(files, cache["entries"])
+    save_json(cache_path, cache)
+
+    resources = assign_resources(results)
+    index = {"icons": {}}
+    header = f"{'File':<60} | {'Detected Hue':<15} | {'Confidence':<10} | {'Resource'}"
+    print(header)
+    print("-" * 100)
+
+    with open(args.report, "w", encoding="utf-8") as out:
+        out.write(header + "\n")
+        out.write("-" * 100 + "\n")
+
+        for f, entry in results.items():
+            if entry is None:
+                print(f"{f:<60} | NOT FOUND")
+                continue
+            line = f"{f:<60} | {entry['hue']:<15} | {entry['confidence']:<10.2f} | {resources[f] or '-'}\n"
             print(line.strip())
             out.write(line)
-        else:
-            print(f"{f:<60} | NOT FOUND")
+
+            key = icon_key(f)
+            index["icons"][key] = {
+                "file": f.replace(os.sep, "/"),
+                "hue": entry["hue"],
+                "confidence": entry["confidence"],
+                "margin": entry["margin"],
+                "resource": resources[f],
+                "overridden": key in RESOURCE_OVERRIDES,
+            }
+
+    save_json(json_path, index)
+    print(f"\nIcon index saved: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Shared helpers for the asset tools: content hashing and small JSON indexes.
+Used to skip work on files whose content has not changed between runs.
+"""
+import hashlib
+import json
+import os
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_sha256(path, cache):
+    """
+    file_sha256 memoized in `cache` ({path: [mtime, size, sha]}); the file is
+    re-read only when its mtime or size changed since it was last hashed.
+    """
+    st = os.stat(path)
+    entry = cache.get(path)
+    if entry and entry[0] == st.st_mtime and entry[1] == st.st_size:
+        return entry[2]
+    digest = file_sha256(path)
+    cache[path] = [st.st_mtime, st.st_size, digest]
+    return digest
+
+
+def load_json(path, default=None):
+    """Load a JSON file, returning `default` if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def save_json(path, data):
+    """Write JSON atomically so an interrupted run never leaves a torn index."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,138 @@
+"""
+Content-Hashed Asset Pack
+Copies every texture PreloadScene loads (plus the generated scenes) to
+files named by their content digest (<digest>.<ext>) and writes a Phaser
+asset-pack JSON that maps the existing texture keys to those URLs, with byte
+sizes. Byte-identical assets (e.g. the underground scenes) share one file
+and one URL, so the browser fetches and caches them once.
+
+Hashed files never change content, so they can be served with long-lived
+immutable cache headers; only the small pack JSON needs revalidation.
+Set CONFIG.assetPackPath in src/config.js to load through the pack. The
+"main" section holds PreloadScene's assets; "scenes" holds the generated
+scene_N textures for on-demand loading.
+
+Usage:
+    python asset_pack.py [--out dist] [--prune]
+"""
+import argparse
+import os
+import re
+import shutil
+
+from asset_cache import file_sha256, load_json, save_json
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+PRELOAD_SCENE = os.path.join(PROJECT_ROOT, "src", "scenes", "PreloadScene.js")
+GAME_CONFIG = os.path.join(PROJECT_ROOT, "src", "config.js")
+SCENE_MANIFEST = os.path.join(PROJECT_ROOT, "New_maps", "scenes_manifest.json")
+PACK_NAME = "asset-pack.json"
+DEFAULT_OUT = "dist"
+HASH_LENGTH = 16
+
+LOAD_START = re.compile(r"this\.load\.(image|spritesheet|video|json)\(")
+# One load statement: quoted key, then a quoted URL or a CONFIG.<name> reference
+LOAD_CALL = re.compile(
+    r"""this\.load\.(image|spritesheet|video|json)\(\s*['"]([^'"\n]+)['"]\s*,\s*"""
+    r"""(?:['"]([^'"\n]+)['"]|CONFIG\.(\w+))\s*(?:,\s*(\{[^{}]*\}))?\s*\)"""
+)
+FRAME_FIELD = re.compile(r"(frameWidth|frameHeight)\s*:\s*(\d+)")
+
+
+def config_value(name, path=GAME_CONFIG):
+    """String literal of CONFIG.<name> in src/config.js; ValueError if it is not one."""
+    with open(path, 'r', encoding='utf-8') as f:
+        m = re.search(rf"""^\s*{re.escape(name)}\s*:\s*['"]([^'"\n]+)['"]""", f.read(), re.MULTILINE)
+    if not m:
+        raise ValueError(f"CONFIG.{name} is not a string literal in {os.path.relpath(path, PROJECT_ROOT)}")
+    return m.group(1)
+
+
+def parse_preload(path=PRELOAD_SCENE):
+    """
+    Returns [{type, key, url[, frameConfig]}, ...] for the active (uncommented)
+    load calls in PreloadScene, de-duplicated by key. URLs given as CONFIG.<name>
+    are resolved from src/config.js; any other non-literal argument raises
+    ValueError rather than dropping the asset from the pack.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        code = "\n".join(line.rstrip("\n").split('//', 1)[0] for line in f)
+
+    entries = {}
+    for start in LOAD_START.finditer(code):
+        m = LOAD_CALL.match(code, start.start())
+        if not m:
+            line = code.count("\n", 0, start.start()) + 1
+            statement = code[start.start():].split(";", 1)[0].strip()
+            raise ValueError(f"{os.path.basename(path)}:{line}: unsupported load call: {statement}")
+        url = m.group(3) if m.group(3) is not None else config_value(m.group(4))
+        entry = {"type": m.group(1), "key": m.group(2), "url": url}
+        if m.group(1) == "spritesheet" and m.group(5):
+            entry["frameConfig"] = {k: int(v) for k, v in FRAME_FIELD.findall(m.group(5))}
+        entries[entry["key"]] = entry
+    return list(entries.values())
+
+
+def scene_entries():
+    """Generated scene textures, keyed like CONSTANTS.SCENE_CONFIG assets (scene_N)."""
+    manifest = load_json(SCENE_MANIFEST)
+    return [
+        {"type": "image", "key": os.path.splitext(s["webp"])[0], "url": f"New_maps/{s['webp']}"}
+        for s in manifest.get("scenes", [])
+    ]
+
+
+def hashed_url(url, digest):
+    """Digest-only name: identical content resolves to the same URL whatever its source path."""
+    return f"{digest[:HASH_LENGTH]}{os.path.splitext(url)[1].lower()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write content-hashed assets and a Phaser asset pack.")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Output directory relative to the project root")
+    parser.add_argument("--prune", action="store_true", help="Delete hashed files no longer in the pack")
+    args = parser.parse_args()
+
+    out_dir = os.path.join(PROJECT_ROOT, args.out)
+    written = set()
+    total_bytes = 0
+
+    # "main" is what PreloadScene loads; "scenes" are fetched on demand per bunker scene
+    pack = {"main": {"files": []}, "scenes": {"files": []}}
+    sections = [("main", e) for e in parse_preload()] + [("scenes", e) for e in scene_entries()]
+
+    for section, entry in sections:
+        src = os.path.join(PROJECT_ROOT, entry["url"])
+        if not os.path.exists(src):
+            print(f"SKIP: {entry['key']} ({entry['url']}) not found")
+            continue
+
+        rel_target = hashed_url(entry["url"], file_sha256(src))
+        target = os.path.normpath(os.path.join(out_dir, rel_target))
+        if not os.path.exists(target):
+            os.makedirs(out_dir, exist_ok=True)
+            shutil.copy2(src, target)
+            print(f"Wrote {rel_target} ({entry['url']})")
+
+        size = os.path.getsize(src)
+        if target not in written:
+            written.add(target)
+            total_bytes += size
+        pack[section]["files"].append(dict(entry, url=f"{args.out}/{rel_target}".replace(os.sep, '/'), bytes=size))
+
+    save_json(os.path.join(out_dir, PACK_NAME), pack)
+    print(f"\nAsset pack: {len(written)} files, {total_bytes / (1024 * 1024):.1f} MB -> {args.out}/{PACK_NAME}")
+
+    if args.prune:
+        for dirpath, _, filenames in os.walk(out_dir, topdown=False):
+            for name in filenames:
+                path = os.path.normpath(os.path.join(dirpath, name))
+                if name != PACK_NAME and path not in written:
+                    os.remove(path)
+                    print(f"Pruned {os.path.relpath(path, out_dir)}")
+            if dirpath != out_dir and not os.listdir(dirpath):
+                os.rmdir(dirpath)  # left over from the old <path>.<hash> layout
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Asset Tools CLI
+One entry point for the asset scripts. Each subcommand imports its module
+only when invoked, and the modules defer numpy / Pillow / imageio until a
+code path needs them, so --help, header-only checks and no-op builds start
+without loading the imaging stack.
+
+Install (editable, so the tools keep resolving paths inside the repo):
+    pip install -e .
+
+Usage:
+    asset-tools <command> [args ...]
+    asset-tools --help
+    python asset_tools.py <command> [args ...]    # without installing
+"""
+import importlib
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand -> (module, entry function, summary). Modules outside the
+# project root are given as paths relative to it.
+COMMANDS = {
+    "build": ("build_assets", "main", "Build assets as a dependency graph"),
+    "bunker-map": ("New_maps/create_bunker_map", "main", "Generate bunker scene maps (--watch, --export-layers, --tiers, --tiles, --png-only)"),
+    "compress-scenes": ("compress_scenes", "main", "Convert scene PNGs to WebP variants"),
+    "check-goldens": ("check_goldens", "main", "Compare generated scenes against golden images"),
+    "spritesheet": ("video_to_spritesheet", "main", "Convert white-background videos to spritesheets (spritesheet_jobs.json)"),
+    "chromakey": ("process_video_chromakey", "main", "Convert a white-background video to alpha WebM (ffmpeg)"),
+    "remove-bg": ("remove_bg_image", "main", "Remove the white background from an image"),
+    "inspect": ("inspect_assets", "main", "Image dims / bbox / padding reports from the asset index"),
+    "crop-icons": ("crop_icons", "crop_images", "Crop btn_* icons to their content"),
+    "split-icons": ("split_icons", "main", "Split icon sheets into single icons"),
+    "analyze-icons": ("analyze_icons", "main", "Map icons to resources by dominant hue"),
+    "quantize-icons": ("quantize_icons", "main", "Quantize UI icons to 8-bit palettes"),
+    "duplicates": ("find_duplicates", "main", "Report clusters of near-identical images (pHash/dHash)"),
+    "tiers": ("texture_tiers", "main", "Write 1x/0.5x/0.25x texture tiers"),
+    "texture-budget": ("texture_budget", "main", "Check GPU texture memory against a budget"),
+    "asset-pack": ("asset_pack", "main", "Write content-hashed assets and a Phaser asset pack"),
+}
+
+
+def load_command(name):
+    """Imports the module behind a subcommand and returns its entry function."""
+    module_path, func_name, _ = COMMANDS[name]
+    module_dir, module_name = os.path.split(module_path)
+    for path in (PROJECT_ROOT, os.path.normpath(os.path.join(PROJECT_ROOT, module_dir))):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def print_usage():
+    print("usage: asset-tools <command> [args ...]\n\ncommands:")
+    for name, (_, _, summary) in COMMANDS.items():
+        print(f"  {name:<16} {summary}")
+    print("\nRun 'asset-tools <command> --help' for command options (where supported).")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"asset-tools: unknown command '{name}'\n", file=sys.stderr)
+        print_usage()
+        return 2
+
+    entry = load_command(name)
+    # The tools parse sys.argv themselves (argparse or flag checks)
+    sys.argv = [f"asset-tools {name}", *args]
+    return entry()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Asset Pipeline Orchestrator
+Runs the asset scripts as a dependency graph instead of by hand.
+
+Each step declares its input globs, the grid_config.json keys it reads, and
+its output globs. Edges are derived from those declarations (a step depends
+on any step whose outputs it consumes). Independent steps run in parallel,
+each in its own process, and a step is skipped when the content hashes of
+its inputs, script and config keys match the last successful run.
+
+Usage:
+    python build_assets.py [step ...] [--force] [--dry-run] [-j N] [--list]
+"""
+import argparse
+import concurrent.futures
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from asset_cache import load_json, save_json, stat_sha256
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+GRID_CONFIG_PATH = os.path.join(PROJECT_ROOT, "grid_config.json")
+STATE_PATH = os.path.join(PROJECT_ROOT, ".build_state.json")
+GARDEN_VIDEO = "Objects/Cutscenes/Garden/download (31).mp4"
+
+# Paths are relative to the project root; globs are expanded at run time.
+# remove_bg_image.py is a per-file utility with no fixed input in the tree
+# (create_bunker_map.py keys its own sources), so it is not a fixed step.
+STEPS = [
+    {
+        "name": "bunker_map",
+        "script": "New_maps/create_bunker_map.py",
+        # WebP variants are compress_scenes' output; the generator only writes PNGs here
+        "args": ["--png-only"],
+        "inputs": [
+            "New_maps/background_city.png",
+            "New_maps/image.png",
+            "New_maps/image copy.png",
+            "New_maps/underground_dirt.png",
+            "Objects/Machines/scrap-v3.png",
+            "Objects/WaterPurifier/water_purifier_v2_1769543600142.png",
+        ],
+        "config": ["floor", "grid", "assetYOffsets", "assetXOffsets", "assetScales", "scenes"],
+        "outputs": ["New_maps/scene_*.png", "New_maps/scenes_manifest.json"],
+    },
+    {
+        "name": "compress_scenes",
+        "script": "compress_scenes.py",
+        "args": [],
+        "inputs": ["New_maps/scene_*.png", "New_maps/scenes_manifest.json"],
+        "config": [],
+        # Sole owner of scene_N.webp and its @0.5x / lqip variants in the build
+        "outputs": ["New_maps/scene_*.webp"],
+    },
+    {
+        "name": "check_goldens",
+        "script": "check_goldens.py",
+        "args": [],
+        "inputs": ["New_maps/scene_*.png", "New_maps/goldens/index.json"],
+        "config": [],
+        "outputs": [],
+    },
+    {
+        "name": "spritesheets",
+        "script": "video_to_spritesheet.py",
+        "args": [],
+        "inputs": [
+            "spritesheet_jobs.json",
+            GARDEN_VIDEO,
+            "characters/cutscenes/Default_running/download (36).mp4",
+            "cutscenes/elevator_cutscene.mp4",
+        ],
+        "config": [],
+        "outputs": [
+            "Objects/Cutscenes/Garden/garden_anim.png",
+            "Objects/Cutscenes/Garden/garden_anim_meta.json",
+            "characters/cutscenes/Default_running/player_run.png",
+            "characters/cutscenes/Default_running/player_run_meta.json",
+            "cutscenes/elevator_anim.png",
+            "cutscenes/elevator_anim_meta.json",
+        ],
+    },
+    {
+        "name": "garden_alpha_video",
+        "script": "process_video_chromakey.py",
+        "args": [GARDEN_VIDEO],
+        "inputs": [GARDEN_VIDEO],
+        "config": [],
+        "outputs": ["Objects/Cutscenes/Garden/download (31)_alpha.webm"],
+    },
+    {
+        "name": "crop_icons",
+        "script": "crop_icons.py",
+        "args": [],
+        "inputs": ["ui_icons/btn_*.png"],
+        "config": [],
+        "outputs": ["ui_icons/btn_*.png"],
+    },
+]
+
+
+def patterns_overlap(a, b):
+    return a == b or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a)
+
+
+def build_graph(steps):
+    """Returns {step_name: set(dependency names)} derived from input/output declarations."""
+    graph = {}
+    for step in steps:
+        deps = set()
+        for other in steps:
+            if other is step:
+                continue
+            if any(patterns_overlap(i, o) for i in step["inputs"] for o in other["outputs"]):
+                deps.add(other["name"])
+        graph[step["name"]] = deps
+    return graph
+
+
+def expand(patterns):
+    files = set()
+    for pattern in patterns:
+        files.update(glob.glob(os.path.join(PROJECT_ROOT, pattern)))
+    return sorted(files)
+
+
+def input_digest(step, grid_config, hashes):
+    """
+    Hash of the step's script, input file contents and grid_config keys.
+    File hashes are reused from `hashes` while mtime and size are unchanged,
+    so a no-op build only stats its inputs.
+    """
+    h = hashlib.sha256()
+    for path in [os.path.join(PROJECT_ROOT, step["script"])] + expand(step["inputs"]):
+        h.update(os.path.relpath(path, PROJECT_ROOT).encode())
+        h.update(stat_sha256(path, hashes).encode())
+    config_subset = {k: grid_config.get(k) for k in step["config"]}
+    h.update(json.dumps(config_subset, sort_keys=True).encode())
+    h.update(json.dumps(step["args"]).encode())
+    return h.hexdigest()
+
+
+def outputs_present(step):
+    return all(expand([pattern]) for pattern in step["outputs"])
+
+
+def run_step(step):
+    start = time.time()
+    cmd = [sys.executable, os.path.join(PROJECT_ROOT, step["script"]), *step["args"]]
+    result = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return result.returncode, result.stdout + result.stderr, time.time() - start
+
+
+def select_steps(names, graph):
+    """Requested steps plus everything upstream of them."""
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(graph[name])
+    return selected
+
+
+def topological_order(graph, selected):
+    """Selected steps ordered so that every step follows its dependencies (ties by name)."""
+    order, placed = [], set()
+    while len(order) < len(selected):
+        batch = sorted(n for n in selected - placed if graph[n] & selected <= placed)
+        if not batch:
+            raise ValueError(f"dependency cycle among: {', '.join(sorted(selected - placed))}")
+        order.extend(batch)
+        placed.update(batch)
+    return order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build assets as a dependency graph.")
+    parser.add_argument("steps", nargs="*", help="Steps to build (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rerun steps even if inputs are unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Parallel steps")
+    parser.add_argument("--list", action="store_true", help="List steps and their dependencies")
+    args = parser.parse_args()
+
+    steps = {s["name"]: s for s in STEPS}
+    graph = build_graph(STEPS)
+
+    if args.list:
+        for name, deps in graph.items():
+            print(f"{name:<20} <- {', '.join(sorted(deps)) or '-'}")
+        return
+
+    unknown = [n for n in args.steps if n not in steps]
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(unknown)}")
+    selected = select_steps(args.steps or list(steps), graph)
+    try:
+        order = topological_order(graph, selected)
+    except ValueError as e:
+        parser.error(str(e))
+
+    grid_config = load_json(GRID_CONFIG_PATH)
+    state = load_json(STATE_PATH)
+    step_state = state.setdefault("steps", {})
+    hashes = state.setdefault("hashes", {})
+    done, failed = set(), set()
+    running = {}
+
+    def ready(name):
+        return name not in done and name not in failed and name not in running.values() \
+            and graph[name] & selected <= done
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        while True:
+            # Dependencies come first, so a skipped or dry-run step unblocks its dependents in the same pass
+            for name in order:
+                if not ready(name):
+                    continue
+                step = steps[name]
+                digest = input_digest(step, grid_config, hashes)
+                if not args.force and step_state.get(name, {}).get("inputs") == digest and outputs_present(step):
+                    print(f"[skip] {name} (inputs unchanged)")
+                    done.add(name)
+                    continue
+                if args.dry_run:
+                    print(f"[would run] {name}")
+                    done.add(name)
+                    continue
+                print(f"[run]  {name}")
+                running[executor.submit(run_step, step)] = name
+
+            if not running:
+                break
+
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                code, output, elapsed = future.result()
+                if code == 0 and not outputs_present(steps[name]):
+                    failed.add(name)
+                    print(f"[FAIL] {name} (declared outputs missing)\n{output}")
+                elif code == 0:
+                    # Re-hash after the run so in-place steps record their own outputs
+                    step_state[name] = {"inputs": input_digest(steps[name], grid_config, hashes)}
+                    done.add(name)
+                    print(f"[done] {name} ({elapsed:.1f}s)")
+                else:
+                    failed.add(name)
+                    print(f"[FAIL] {name} (exit {code})\n{output}")
+
+    if not args.dry_run:
+        save_json(STATE_PATH, state)
+
+    blocked = selected - done - failed
+    if blocked:
+        print(f"Blocked by failures: {', '.join(sorted(blocked))}")
+    if failed or blocked:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Golden-Image Regression Check
+Compares the generated scene PNGs against stored goldens so alignment
+regressions (see "Locked Values" in AI_INSTRUCTIONS.md) fail loudly instead
+of relying on eyeballing scene_N.webp.
+
+Each scene is checked in stages and stops at the first conclusive one:
+1. Content hash equals the golden's -> identical, nothing decoded.
+2. Coarse tile grid: per 64x64 tile, channel sums plus x- and y-weighted
+   sums (a box-downsampled grid that also moves when content shifts inside
+   a tile). Only the new output is decoded; the golden's grid is stored.
+3. Full-resolution diff, only on tiles whose grid entries differ.
+
+Changed tiles are merged into rectangles (changed-pixel bounds) and a diff
+image is written: the golden in dimmed grayscale, changed pixels in red,
+rectangles outlined.
+
+Goldens live in New_maps/goldens/, content-addressed (identical scenes share
+one file), with index.json mapping scene PNGs to them.
+
+Usage:
+    python check_goldens.py [scene_1.png ...] [--tolerance 0] [--fail-fast] [--allow-missing]
+    python check_goldens.py --update [scene_1.png ...]    # accept current outputs
+Exit code 1 when any scene differs, its PNG is missing, or it has no golden
+yet (record one with --update; --allow-missing only warns about those).
+"""
+import argparse
+import concurrent.futures
+import os
+import shutil
+import sys
+import time
+
+from asset_cache import file_sha256, load_json, save_json
+from compress_scenes import MAP_DIR, discover_scenes
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+
+GOLDEN_DIR = os.path.join(MAP_DIR, "goldens")
+GOLDEN_INDEX = os.path.join(GOLDEN_DIR, "index.json")
+DIFF_DIR = os.path.join(GOLDEN_DIR, "diff")
+TILE = 64
+
+
+def load_rgba(path):
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def tile_signature(pixels, tile=TILE, band=4):
+    """
+    (tiles_y, tiles_x, 12) int64: per tile and RGBA channel the sum, the
+    x-weighted sum and the y-weighted sum. Exact (float32 partial sums stay
+    below 2^24); edge tiles are zero-padded. Works in bands of `band` tile
+    rows so the float32 buffers stay small.
+    """
+    h, w = pixels.shape[:2]
+    if h % tile or w % tile:
+        pixels = np.pad(pixels, ((0, -h % tile), (0, -w % tile), (0, 0)))
+    tiles_y, tiles_x = pixels.shape[0] // tile, pixels.shape[1] // tile
+
+    # Row segment of one tile width -> [sum, x-weighted sum] per channel, as one BLAS matmul
+    weights = np.zeros((tile, 4, 8), dtype=np.float32)
+    for c in range(4):
+        weights[:, c, c] = 1
+        weights[:, c, 4 + c] = np.arange(tile)
+    weights = weights.reshape(tile * 4, 8)
+    y = np.arange(tile, dtype=np.int64)
+
+    signature = np.empty((tiles_y, tiles_x, 12), dtype=np.int64)
+    for ty in range(0, tiles_y, band):
+        chunk = pixels[ty * tile:(ty + band) * tile]
+        n = chunk.shape[0] // tile
+        rows = (chunk.reshape(-1, tile * 4).astype(np.float32) @ weights).astype(np.int64)
+        rows = rows.reshape(n, tile, tiles_x, 8)
+        signature[ty:ty + n, :, :8] = rows.sum(axis=1)
+        signature[ty:ty + n, :, 8:] = np.einsum('iyjc,y->ijc', rows[..., :4], y)
+    return signature
+
+
+def golden_paths(digest):
+    return os.path.join(GOLDEN_DIR, f"{digest}.png"), os.path.join(GOLDEN_DIR, f"{digest}_tiles.npy")
+
+
+def record_golden(png_name, digest):
+    """Stores the current output of `png_name` as golden `digest`. Runs in a worker process."""
+    png_path = os.path.join(MAP_DIR, png_name)
+    golden_png, golden_tiles = golden_paths(digest)
+    pixels = load_rgba(png_path)
+    if not os.path.exists(golden_png):
+        shutil.copy2(png_path, golden_png)
+    if not os.path.exists(golden_tiles):
+        np.save(golden_tiles, tile_signature(pixels))
+    return {"sha256": digest, "width": pixels.shape[1], "height": pixels.shape[0], "tile": TILE}
+
+
+def merge_tiles(changed):
+    """Groups {(ty, tx): (x0, y0, x1, y1)} into rectangles over 8-connected tiles."""
+    rects = []
+    pending = set(changed)
+    while pending:
+        stack = [pending.pop()]
+        x0, y0, x1, y1 = changed[stack[0]]
+        while stack:
+            ty, tx = stack.pop()
+            bx0, by0, bx1, by1 = changed[(ty, tx)]
+            x0, y0, x1, y1 = min(x0, bx0), min(y0, by0), max(x1, bx1), max(y1, by1)
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    neighbor = (ty + dy, tx + dx)
+                    if neighbor in pending:
+                        pending.remove(neighbor)
+                        stack.append(neighbor)
+        rects.append([x0, y0, x1 - x0, y1 - y0])
+    return sorted(rects, key=lambda r: (r[1], r[0]))
+
+
+def write_diff_image(golden, masks, rects, path):
+    """Golden in dimmed grayscale, changed pixels red, changed regions outlined."""
+    gray = (np.asarray(Image.fromarray(golden).convert('L'), dtype=np.float32) * 0.35).astype(np.uint8)
+    canvas = np.repeat(gray[..., None], 3, axis=-1)
+    for (y, x), mask in masks.items():
+        region = canvas[y:y + mask.shape[0], x:x + mask.shape[1]]
+        region[mask] = (255, 0, 0)
+    image = Image.fromarray(canvas)
+    draw = ImageDraw.Draw(image)
+    for x, y, w, h in rects:
+        draw.rectangle([x - 2, y - 2, x + w + 1, y + h + 1], outline=(255, 220, 0), width=2)
+    image.save(path, compress_level=1)
+
+
+def check_scene(png_name, golden, tolerance, diff_dir):
+    """Compares one scene against its golden. Runs in a worker process."""
+    start = time.time()
+    png_path = os.path.join(MAP_DIR, png_name)
+    result = {"png": png_name}
+    if not os.path.exists(png_path):
+        return dict(result, status="missing", seconds=time.time() - start)
+
+    # Stage 1: identical bytes
+    if file_sha256(png_path) == golden["sha256"]:
+        return dict(result, status="identical", seconds=time.time() - start)
+
+    pixels = load_rgba(png_path)
+    if (pixels.shape[1], pixels.shape[0]) != (golden["width"], golden["height"]):
+        return dict(result, status="size", size=[pixels.shape[1], pixels.shape[0]],
+                    seconds=time.time() - start)
+
+    # Stage 2: coarse tile grid against the stored one
+    golden_png, golden_tiles = golden_paths(golden["sha256"])
+    mismatched = np.argwhere((tile_signature(pixels) != np.load(golden_tiles)).any(axis=-1))
+    if not len(mismatched):
+        return dict(result, status="match", seconds=time.time() - start)
+
+    # Stage 3: full-resolution diff of the mismatching tiles only
+    reference = load_rgba(golden_png)
+    changed, masks = {}, {}
+    for ty, tx in mismatched.tolist():
+        y, x = ty * TILE, tx * TILE
+        delta = np.abs(pixels[y:y + TILE, x:x + TILE].astype(np.int16) -
+                       reference[y:y + TILE, x:x + TILE].astype(np.int16)).max(axis=-1)
+        mask = delta > tolerance
+        if not mask.any():
+            continue
+        ys, xs = np.nonzero(mask)
+        changed[(ty, tx)] = (x + int(xs.min()), y + int(ys.min()), x + int(xs.max()) + 1, y + int(ys.max()) + 1)
+        masks[(y, x)] = mask
+
+    if not changed:
+        return dict(result, status="within tolerance", tiles=len(mismatched), seconds=time.time() - start)
+
+    rects = merge_tiles(changed)
+    diff_path = os.path.join(diff_dir, f"{os.path.splitext(png_name)[0]}_diff.png")
+    write_diff_image(reference, masks, rects, diff_path)
+    return dict(result, status="changed", rects=rects, tiles=len(mismatched),
+                pixels=int(sum(m.sum() for m in masks.values())), diff=diff_path,
+                seconds=time.time() - start)
+
+
+def update(scenes):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    index = load_json(GOLDEN_INDEX)
+
+    # One worker per distinct output, so identical scenes never write the same golden twice
+    by_digest = {}
+    for png in scenes:
+        png_path = os.path.join(MAP_DIR, png)
+        if os.path.exists(png_path):
+            by_digest.setdefault(file_sha256(png_path), []).append(png)
+        else:
+            print(f"SKIP: {png_path} not found")
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        futures = {executor.submit(record_golden, pngs[0], digest): pngs for digest, pngs in by_digest.items()}
+        for future in concurrent.futures.as_completed(futures):
+            entry = future.result()
+            for png in futures[future]:
+                index[png] = entry
+                print(f"Golden recorded: {png} ({entry['sha256'][:12]})")
+    save_json(GOLDEN_INDEX, index)
+
+    # Drop golden files no scene refers to any more
+    referenced = {p for entry in index.values() for p in golden_paths(entry["sha256"])}
+    for name in os.listdir(GOLDEN_DIR):
+        path = os.path.join(GOLDEN_DIR, name)
+        if os.path.isfile(path) and path != GOLDEN_INDEX and path not in referenced:
+            os.remove(path)
+            print(f"Pruned {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check generated scenes against golden images.")
+    parser.add_argument("scenes", nargs="*", help="Scene PNG names (default: all scenes)")
+    parser.add_argument("--update", action="store_true", help="Record the current outputs as goldens")
+    parser.add_argument("--tolerance", type=int, default=0, help="Max per-channel difference to ignore")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first differing scene")
+    parser.add_argument("--diff-dir", default=DIFF_DIR, help="Where to write diff images")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Only warn about scenes that have no golden yet instead of failing")
+    args = parser.parse_args()
+
+    scenes = args.scenes or [png for png, _ in discover_scenes()]
+    if args.update:
+        update(scenes)
+        return
+
+    index = load_json(GOLDEN_INDEX)
+    unchecked = [png for png in scenes if png not in index]
+    for png in unchecked:
+        print(f"{'WARN' if args.allow_missing else 'ERROR'}: no golden for {png} (record with --update)")
+
+    os.makedirs(args.diff_dir, exist_ok=True)
+    failed = bool(unchecked) and not args.allow_missing
+    start = time.time()
+    executor = concurrent.futures.ProcessPoolExecutor()
+    futures = [executor.submit(check_scene, png, index[png], args.tolerance, args.diff_dir)
+               for png in scenes if png in index and not (failed and args.fail_fast)]
+    try:
+        for future in concurrent.futures.as_completed(futures):
+            r = future.result()
+            print(f"{r['png']:<16} {r['status']:<17} {r['seconds'] * 1000:>6.0f} ms")
+            if r["status"] in ("identical", "match", "within tolerance"):
+                continue
+            failed = True
+            if r["status"] == "missing":
+                print(f"  {os.path.join(MAP_DIR, r['png'])} not found")
+            elif r["status"] == "size":
+                print(f"  size {r['size'][0]}x{r['size'][1]}, golden "
+                      f"{index[r['png']]['width']}x{index[r['png']]['height']}")
+            elif r["status"] == "changed":
+                print(f"  {r['pixels']} pixels in {len(r['rects'])} region(s), diff: {r['diff']}")
+                for x, y, w, h in r["rects"]:
+                    print(f"    x={x} y={y} w={w} h={h}")
+            if args.fail_fast:
+                break
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    print(f"\nChecked in {time.time() - start:.2f}s")
+    if failed:
+        print("FAIL: scenes differ from goldens or have none" if unchecked and not args.allow_missing
+              else "FAIL: scenes differ from goldens")
+        sys.exit(1)
+    checked = len(scenes) - len(unchecked)
+    print(f"PASS: {checked} scene(s) match goldens" + (f", {len(unchecked)} without golden" if unchecked else ""))
+
+
+if __name__ == "__main__":
+    main()
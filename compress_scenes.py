@@ -1,39 +1,198 @@
 """
 Convert scene_*.png to scene_*.webp at high quality (95).
-Keeps original PNGs in a backup folder.
+Keeps original PNGs in a content-addressed backup folder.
 WebP at quality 95 is visually lossless and typically 60-80% smaller.
+
+encode_scene() is the only writer of scene WebP files: create_bunker_map
+encodes its renders through it too, so the shipped bytes do not depend on
+which tool ran last.
+
+Scenes are discovered from New_maps/scenes_manifest.json (written by
+create_bunker_map.py), falling back to its SCENE_CONFIGS list.
+Conversions run in parallel, one process per core.
+
+Each scene is also written as half-resolution and blurred placeholder
+variants from the same decode; their sizes are recorded in the manifest.
+Pass --tiers to add a quarter-resolution tier.
+
+png_originals/index.json records, per scene, the PNG digest and the digest
+of every variant written. A scene is skipped only when both still match, so
+variants overwritten by hand are re-encoded. Byte-identical scenes (the
+underground floors) are encoded once; the others copy its variants.
 """
-from PIL import Image
+import concurrent.futures
 import os
 import shutil
+import sys
 
-MAP_DIR = 'New_maps'
-BACKUP_DIR = 'New_maps/png_originals'
+from asset_cache import file_sha256, load_json, save_json
+from lazy_import import lazy_import
+from scene_variants import describe_variants, required_variants, save_variants, variant_filename
+
+Image = lazy_import("PIL.Image")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MAP_DIR = os.path.join(SCRIPT_DIR, 'New_maps')
+BACKUP_DIR = os.path.join(MAP_DIR, 'png_originals')
+BACKUP_INDEX = os.path.join(BACKUP_DIR, 'index.json')
+MANIFEST_PATH = os.path.join(MAP_DIR, 'scenes_manifest.json')
 QUALITY = 95
+# Method 6 is ~7x slower for ~3% smaller files, too slow for watch-mode re-renders
+METHOD = 4
+
 
-os.makedirs(BACKUP_DIR, exist_ok=True)
+def discover_scenes():
+    """Return [(png_name, webp_name), ...] from the manifest or SCENE_CONFIGS."""
+    manifest = load_json(MANIFEST_PATH)
+    if manifest.get('scenes'):
+        return [(s['png'], s['webp']) for s in manifest['scenes']]
 
-for i in range(1, 11):
-    png_path = os.path.join(MAP_DIR, f'scene_{i}.png')
-    webp_path = os.path.join(MAP_DIR, f'scene_{i}.webp')
-    backup_path = os.path.join(BACKUP_DIR, f'scene_{i}.png')
+    sys.path.insert(0, MAP_DIR)
+    from create_bunker_map import SCENE_CONFIGS
+    return [(f"scene_{c['id']}.png", f"scene_{c['id']}.webp") for c in SCENE_CONFIGS]
+
+
+def encode_scene(image, output_dir, stem, tiers=False):
+    """Writes the WebP variants of one scene (see save_variants). Returns describe_variants()."""
+    return save_variants(image, output_dir, stem, quality=QUALITY, method=METHOD, tiers=tiers)
+
+
+def variant_digests(stem, tiers=False):
+    """{variant file: sha256} for the required variants of `stem`, or None if one is missing."""
+    digests = {}
+    for v in required_variants(tiers):
+        name = variant_filename(stem, v)
+        path = os.path.join(MAP_DIR, name)
+        if not os.path.exists(path):
+            return None
+        digests[name] = file_sha256(path)
+    return digests
+
+
+def convert_scene(png_name, webp_name, known, tiers=False, digest=None):
+    """
+    Convert one scene and back up its PNG. `known` is the scene's index entry
+    from the last run ({"png": sha256, "variants": {file: sha256}}).
+    Runs in a worker process.
+    """
+    png_path = os.path.join(MAP_DIR, png_name)
+    webp_path = os.path.join(MAP_DIR, webp_name)
 
     if not os.path.exists(png_path):
-        print(f'SKIP: {png_path} not found')
-        continue
+        return {'png': png_name, 'status': 'missing'}
+
+    digest = digest or file_sha256(png_path)
+    backup_path = os.path.join(BACKUP_DIR, f'{digest}.png')
+    stem = os.path.splitext(webp_name)[0]
+    known = known if isinstance(known, dict) else {}
+
+    if digest == known.get('png') and os.path.exists(backup_path):
+        variants = variant_digests(stem, tiers)
+        if variants is not None and all(known.get('variants', {}).get(name) == sha for name, sha in variants.items()):
+            return {'png': png_name, 'webp': webp_name, 'status': 'unchanged', 'hash': digest,
+                    'variants': known['variants']}
 
     png_size = os.path.getsize(png_path) / (1024 * 1024)
-    print(f'Converting {png_path} ({png_size:.1f} MB)...')
 
-    img = Image.open(png_path)
-    img.save(webp_path, 'WEBP', quality=QUALITY, method=6)
+    with Image.open(png_path) as img:
+        encode_scene(img, MAP_DIR, stem, tiers=tiers)
 
     webp_size = os.path.getsize(webp_path) / (1024 * 1024)
-    ratio = (1 - webp_size / png_size) * 100
 
-    # Backup original
-    shutil.copy2(png_path, backup_path)
+    # Backup original (content-addressed: identical PNGs are stored once)
+    if not os.path.exists(backup_path):
+        shutil.copy2(png_path, backup_path)
+
+    return {
+        'png': png_name,
+        'webp': webp_name,
+        'status': 'converted',
+        'hash': digest,
+        'variants': variant_digests(stem, tiers),
+        'png_mb': png_size,
+        'webp_mb': webp_size,
+    }
+
+
+def reuse_variants(source, png_name, webp_name, known, tiers=False):
+    """
+    Gives scene `png_name`, whose PNG is byte-identical to `source` (a
+    convert_scene result), copies of the source's variants instead of encoding
+    them again. Skipped when the index already records exactly those digests.
+    """
+    src_stem, stem = os.path.splitext(source['webp'])[0], os.path.splitext(webp_name)[0]
+    variants = {variant_filename(stem, v): source['variants'][variant_filename(src_stem, v)]
+                for v in required_variants(tiers)}
+    known = known if isinstance(known, dict) else {}
+    if known.get('png') == source['hash'] and known.get('variants') == variants \
+            and variant_digests(stem, tiers) == variants:
+        return {'png': png_name, 'status': 'unchanged', 'hash': source['hash'], 'variants': variants}
+
+    for v in required_variants(tiers):
+        shutil.copyfile(os.path.join(MAP_DIR, variant_filename(src_stem, v)),
+                        os.path.join(MAP_DIR, variant_filename(stem, v)))
+    return {'png': png_name, 'webp': webp_name, 'status': 'reused', 'source': source['webp'],
+            'hash': source['hash'], 'variants': variants}
+
+
+def main():
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    index = load_json(BACKUP_INDEX)
+    tiers = '--tiers' in sys.argv[1:]
+    scenes = discover_scenes()
+    print(f'Found {len(scenes)} scenes')
+
+    # Scenes by PNG digest: one conversion per distinct content
+    groups = {}
+    for png_name, webp_name in scenes:
+        png_path = os.path.join(MAP_DIR, png_name)
+        if not os.path.exists(png_path):
+            print(f'SKIP: {png_path} not found')
+            continue
+        groups.setdefault(file_sha256(png_path), []).append((png_name, webp_name))
+
+    def record(result):
+        png_path = os.path.join(MAP_DIR, result['png'])
+        index[result['png']] = {'png': result['hash'], 'variants': result['variants']}
+        if result['status'] == 'unchanged':
+            print(f'UNCHANGED: {png_path}')
+        elif result['status'] == 'reused':
+            print(f"Reused {result['source']} for {result['webp']} (identical PNG)")
+        else:
+            ratio = (1 - result['webp_mb'] / result['png_mb']) * 100
+            print(f"Converted {png_path} ({result['png_mb']:.1f} MB) -> "
+                  f"{result['webp']} ({result['webp_mb']:.1f} MB) — {ratio:.0f}% smaller")
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(convert_scene, *group[0], index.get(group[0][0]), tiers, digest): group
+            for digest, group in groups.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            group = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f'Conversion failed: {e}')
+                continue
+
+            if result['status'] == 'missing':
+                print(f"SKIP: {os.path.join(MAP_DIR, result['png'])} not found")
+                continue
+            record(result)
+            for png_name, webp_name in group[1:]:
+                record(reuse_variants(result, png_name, webp_name, index.get(png_name), tiers))
+
+    save_json(BACKUP_INDEX, index)
+
+    # Record variant sizes so the preloader can pick placeholder -> half -> full
+    manifest = load_json(MANIFEST_PATH)
+    if manifest.get('scenes'):
+        for scene in manifest['scenes']:
+            scene['variants'] = describe_variants(MAP_DIR, os.path.splitext(scene['webp'])[0])
+        save_json(MANIFEST_PATH, manifest)
+    print('\nDone! Originals backed up to:', BACKUP_DIR)
 
-    print(f'  -> {webp_path} ({webp_size:.1f} MB) — {ratio:.0f}% smaller')
 
-print('\nDone! Originals backed up to:', BACKUP_DIR)
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,36 @@
-from PIL import Image
 import glob
 import os
 
+from inspect_assets import PROJECT_ROOT, inspect, load_index, save_index
+from lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+
 def crop_images():
-    files = glob.glob("ui_icons/btn_*.png")
+    index = load_index()
+    files = sorted(glob.glob(os.path.join(PROJECT_ROOT, "ui_icons", "btn_*.png")))
     print(f"Found {len(files)} images to process.")
     for f in files:
+        rel_path = os.path.relpath(f, PROJECT_ROOT).replace(os.sep, '/')
         try:
-            img = Image.open(f)
-            bbox = img.getbbox()
-            if bbox:
-                original_size = img.size
-                cropped = img.crop(bbox)
-                cropped.save(f)
-                print(f"Cropped {os.path.basename(f)}: {original_size} -> {cropped.size}")
-            else:
+            # bbox comes from the asset index; already-cropped icons are never re-decoded
+            entry = inspect(index, rel_path, need_pixels=True)
+            bbox = entry["bbox"]
+            if not bbox:
                 print(f"Skipped {os.path.basename(f)} (empty)")
+                continue
+            original_size = (entry["width"], entry["height"])
+            if tuple(bbox) == (0, 0) + original_size:
+                print(f"Skipped {os.path.basename(f)} (already cropped)")
+                continue
+            with Image.open(f) as img:
+                cropped = img.crop(tuple(bbox))
+            cropped.save(f)
+            inspect(index, rel_path, need_pixels=True)
+            print(f"Cropped {os.path.basename(f)}: {original_size} -> {cropped.size}")
         except Exception as e:
             print(f"Error processing {f}: {e}")
+    save_index(index)
 
 if __name__ == "__main__":
     crop_images()
@@ -0,0 +1,292 @@
+"""
+Near-Duplicate Asset Finder
+Groups images that look the same (re-exports, -removebg-preview copies,
+v3/v4 revisions) so redundant sources can be pruned from the pipeline.
+
+- Only source assets are compared: pipeline output directories are not
+  scanned (see inspect_assets), and the generated scenes plus the WebP /
+  resolution variants written next to an image (scene_1.webp,
+  scene_1@0.5x.webp, scene_1_lqip.webp) are dropped before hashing.
+- Every image gets a 64-bit pHash (DCT of a 32x32 grayscale thumbnail) and
+  dHash (horizontal gradient of a 9x8 thumbnail). Transparent pixels are
+  composited over white, so a background-removed copy still matches its
+  white-background original.
+- Thumbnails are decoded in a process pool and hashed in one NumPy batch.
+- Hashes are cached in the asset index (.asset_index.json) next to each
+  file's content hash and reused for identical content at other paths.
+- Candidate pairs come from a BK-tree over pHash (Hamming distance), so
+  clustering does not compare every pair; dHash must also agree.
+- Each cluster is built around its largest unclustered image, and only images
+  within both radii of that reference join it, so distances never chain
+  past the thresholds.
+- Intentional state variants (btn_x_active / btn_x_inactive) are reported
+  but not counted as reclaimable.
+
+Usage:
+    python find_duplicates.py [--glob "Objects/*"] [--phash 10] [--dhash 12] [--json duplicates.json]
+"""
+import argparse
+import concurrent.futures
+import fnmatch
+import os
+import re
+
+from asset_cache import save_json
+from compress_scenes import MAP_DIR, discover_scenes
+from inspect_assets import PROJECT_ROOT, inspect, load_index, save_index, scan
+from lazy_import import lazy_import
+from scene_variants import VARIANTS, variant_filename
+from texture_tiers import TIER_SCALES, tier_filename
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+PHASH_SIZE = 32
+HASH_SIZE = 8
+STATE_SUFFIX = re.compile(r"_(active|inactive|hover|pressed|disabled|selected)$")
+
+
+def dct_matrix(n):
+    """Orthonormal DCT-II basis as an (n, n) matrix."""
+    k = np.arange(n)[:, None]
+    basis = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis
+
+
+def load_thumbnails(full_path):
+    """Decodes one image to the grayscale thumbnails both hashes need. Runs in a worker process."""
+    with Image.open(full_path) as img:
+        img.draft('RGB', (PHASH_SIZE * 4, PHASH_SIZE * 4))  # JPEG: decode at reduced scale
+        img = img.convert('RGBA')
+    flat = Image.new('RGBA', img.size, (255, 255, 255, 255))
+    flat.alpha_composite(img)
+    gray = flat.convert('L')
+    return (
+        np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS), dtype=np.float32),
+        np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.float32),
+    )
+
+
+def pack_bits(bits):
+    """(N, 64) bool -> list of 64-bit ints."""
+    weights = 1 << np.arange(63, -1, -1, dtype=np.uint64)
+    return [int(v) for v in (bits.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)]
+
+
+def batch_hashes(phash_thumbs, dhash_thumbs):
+    """
+    pHash and dHash for a stack of thumbnails: (N, 32, 32) and (N, 8, 9).
+    Returns two lists of 64-bit ints.
+    """
+    d = dct_matrix(PHASH_SIZE)
+    coeffs = np.einsum('ij,njk,lk->nil', d, phash_thumbs, d)[:, :HASH_SIZE, :HASH_SIZE]
+    coeffs = coeffs.reshape(len(coeffs), -1)
+    # Median of the low frequencies, excluding the DC term
+    medians = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    phashes = pack_bits(coeffs > medians)
+
+    dhashes = pack_bits((dhash_thumbs[:, :, 1:] > dhash_thumbs[:, :, :-1]).reshape(len(dhash_thumbs), -1))
+    return phashes, dhashes
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance."""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, value):
+        if self.root is None:
+            self.root = (value, {})
+            return
+        node = self.root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                return
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (value, {})
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Yields (hash, distance) for every stored hash within `radius`."""
+        pending = [self.root] if self.root else []
+        while pending:
+            node_value, children = pending.pop()
+            dist = hamming(value, node_value)
+            if dist <= radius:
+                yield node_value, dist
+            # Triangle inequality: only subtrees at distance dist +/- radius can match
+            for edge, child in children.items():
+                if dist - radius <= edge <= dist + radius:
+                    pending.append(child)
+
+
+def generated_files(paths):
+    """
+    Paths in `paths` written by the pipeline rather than kept as sources: the
+    generated scenes and the WebP / resolution-tier variants of another path.
+    """
+    present = set(paths)
+    generated = {os.path.relpath(os.path.join(MAP_DIR, name), PROJECT_ROOT).replace(os.sep, '/')
+                 for scene in discover_scenes() for name in scene}
+    for p in paths:
+        stem, ext = os.path.splitext(p)
+        derived = {variant_filename(stem, v) for v in VARIANTS} | {tier_filename(stem, s, ext) for s in TIER_SCALES}
+        generated |= derived - {p}
+    return generated & present
+
+
+def compute_hashes(index, paths):
+    """
+    Fills entry["phash"] / entry["dhash"] (hex) for `paths`, decoding only
+    content that has no cached hash under any path.
+    """
+    by_sha = {e["sha256"]: e for e in index["files"].values() if "phash" in e}
+    todo = []
+    for p in paths:
+        entry = inspect(index, p)
+        if "phash" in entry:
+            continue
+        cached = by_sha.get(entry["sha256"])
+        if cached:
+            entry["phash"], entry["dhash"] = cached["phash"], cached["dhash"]
+        else:
+            todo.append(p)
+
+    if not todo:
+        return
+    print(f"Hashing {len(todo)} images...")
+    thumbs = {}
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        futures = {executor.submit(load_thumbnails, os.path.join(PROJECT_ROOT, p)): p for p in todo}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                thumbs[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error reading {futures[future]}: {e}")
+
+    done = sorted(thumbs)
+    if not done:
+        return
+    phashes, dhashes = batch_hashes(np.stack([thumbs[p][0] for p in done]), np.stack([thumbs[p][1] for p in done]))
+    for p, ph, dh in zip(done, phashes, dhashes):
+        entry = index["files"][p]
+        entry["phash"], entry["dhash"] = f"{ph:016x}", f"{dh:016x}"
+        by_sha[entry["sha256"]] = entry
+
+
+def reference_order(files, paths):
+    """Largest image first: it is the one to keep, and distances are measured to it."""
+    return sorted(paths, key=lambda p: (-files[p]["width"] * files[p]["height"], -files[p]["bytes"], p))
+
+
+def state_key(path):
+    """Path without its state suffix for state-variant names like btn_x_active, else None."""
+    stem = os.path.splitext(path)[0]
+    match = STATE_SUFFIX.search(stem)
+    return stem[:match.start()] if match else None
+
+
+def find_clusters(index, paths, phash_radius, dhash_radius):
+    """
+    Groups paths whose pHash and dHash are both within the given Hamming
+    radii of the cluster's reference (complete linkage to the largest member,
+    not chains of pairwise matches).
+    """
+    files = index["files"]
+    phash = {p: int(files[p]["phash"], 16) for p in paths if "phash" in files[p]}
+    dhash = {p: int(files[p]["dhash"], 16) for p in phash}
+
+    by_hash = {}
+    tree = BKTree()
+    for p, h in phash.items():
+        by_hash.setdefault(h, []).append(p)
+        tree.add(h)
+
+    clusters = []
+    clustered = set()
+    for ref in reference_order(files, phash):
+        if ref in clustered:
+            continue
+        members = [ref] + [p for other, _ in tree.query(phash[ref], phash_radius) for p in by_hash[other]
+                           if p != ref and p not in clustered and hamming(dhash[ref], dhash[p]) <= dhash_radius]
+        clustered.update(members)
+        if len(members) > 1:
+            clusters.append(sorted(members))
+    return clusters
+
+
+def describe_cluster(index, members):
+    """
+    Cluster summary. The largest image is the reference (distances are measured
+    to it); every other member counts as reclaimable unless it is a state
+    variant of another member.
+    """
+    files = index["files"]
+    members = reference_order(files, members)
+    ref_p, ref_d = int(files[members[0]]["phash"], 16), int(files[members[0]]["dhash"], 16)
+    keys = [state_key(p) for p in members]
+    states = {p for p, key in zip(members, keys) if key is not None and keys.count(key) > 1}
+    return {
+        "files": [{
+            "path": p,
+            "width": files[p]["width"],
+            "height": files[p]["height"],
+            "bytes": files[p]["bytes"],
+            "identical": files[p]["sha256"] == files[members[0]]["sha256"],
+            "stateVariant": p in states,
+            "phashDistance": hamming(int(files[p]["phash"], 16), ref_p),
+            "dhashDistance": hamming(int(files[p]["dhash"], 16), ref_d),
+        } for p in members],
+        "bytes": sum(files[p]["bytes"] for p in members),
+        "reclaimableBytes": sum(files[p]["bytes"] for p in members[1:] if p not in states),
+        "reclaimableFiles": sum(1 for p in members[1:] if p not in states),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report clusters of near-identical images.")
+    parser.add_argument("--glob", default="*", help="Filter paths (relative to project root)")
+    parser.add_argument("--phash", type=int, default=10, help="Max pHash Hamming distance (of 64 bits)")
+    parser.add_argument("--dhash", type=int, default=12, help="Max dHash Hamming distance (of 64 bits)")
+    parser.add_argument("--json", default=None, help="Write clusters as JSON here")
+    args = parser.parse_args()
+
+    index = load_index()
+    paths = scan(index)
+    generated = generated_files(paths)
+    paths = [p for p in paths if p not in generated and fnmatch.fnmatch(p, args.glob)]
+    compute_hashes(index, paths)
+    save_index(index)
+
+    clusters = [describe_cluster(index, c) for c in find_clusters(index, paths, args.phash, args.dhash)]
+    clusters.sort(key=lambda c: c["reclaimableBytes"], reverse=True)
+
+    print(f"Hashed {len(paths)} images, {len(clusters)} near-duplicate clusters\n")
+    for i, cluster in enumerate(clusters, 1):
+        print(f"Cluster {i}: {len(cluster['files'])} files, {cluster['bytes'] / 1024:.0f} KB "
+              f"({cluster['reclaimableBytes'] / 1024:.0f} KB reclaimable)")
+        for j, f in enumerate(cluster["files"]):
+            match = "reference" if j == 0 else "state" if f["stateVariant"] else \
+                "identical" if f["identical"] else f"p{f['phashDistance']:>2} d{f['dhashDistance']:>2}"
+            print(f"  {f['bytes'] / 1024:>8.0f} KB  {f['width']:>5}x{f['height']:<5} {match:<10} {f['path']}")
+        print()
+
+    total = sum(c["reclaimableBytes"] for c in clusters)
+    print(f"Reclaimable: {total / 1024:.0f} KB across {sum(c['reclaimableFiles'] for c in clusters)} files")
+
+    if args.json:
+        save_json(args.json, {"phash": args.phash, "dhash": args.dhash, "clusters": clusters})
+        print(f"Clusters saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Asset Inspector
+Walks the asset tree once and keeps an incremental index of image metadata,
+so size / bbox / padding reports are queries instead of rescans.
+
+- Dimensions come from the image header (PIL opens lazily; no pixel decode).
+- Pixels are decoded only when a report needs bbox or alpha stats, and the
+  result is cached in the index.
+- Entries are keyed by path and revalidated by mtime + file size; when those
+  change the content hash decides whether cached stats are still valid.
+- Output directories of the pipeline tools (asset pack, goldens, PNG
+  backups, tile pyramids, layered export) are not walked: they hold copies
+  and derivatives of the sources, not assets of their own.
+
+Replaces check_res.py, check_bbox.py, check_icon_dims.py,
+check_dims_simple.py and check_padding.py.
+
+Usage:
+    python inspect_assets.py dims    [--glob "ui_icons/*.png"]
+    python inspect_assets.py bbox    [--glob "ui_icons/icon_*.png"]
+    python inspect_assets.py padding [--glob "ui_icons/btn_*.png"]
+    python inspect_assets.py scan
+"""
+import argparse
+import fnmatch
+import os
+import sys
+
+from asset_cache import file_sha256, load_json, save_json
+from asset_pack import DEFAULT_OUT as PACK_DIR_NAME
+from check_goldens import GOLDEN_DIR
+from compress_scenes import BACKUP_DIR, MAP_DIR
+from lazy_import import lazy_import
+from scene_tiles import TILE_DIR_NAME
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(PROJECT_ROOT, ".asset_index.json")
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__'}
+
+
+def generated_dirs():
+    """Absolute paths of the directories the pipeline tools write their outputs to."""
+    if MAP_DIR not in sys.path:
+        sys.path.insert(0, MAP_DIR)
+    from create_bunker_map import LAYERED_DIR_NAME
+    return {os.path.normpath(p) for p in (
+        os.path.join(PROJECT_ROOT, PACK_DIR_NAME),
+        GOLDEN_DIR,
+        BACKUP_DIR,
+        os.path.join(MAP_DIR, TILE_DIR_NAME),
+        os.path.join(MAP_DIR, LAYERED_DIR_NAME),
+    )}
+
+
+def load_index(path=INDEX_PATH):
+    index = load_json(path)
+    if index.get("version") != INDEX_VERSION:
+        index = {"version": INDEX_VERSION, "files": {}}
+    return index
+
+
+def save_index(index, path=INDEX_PATH):
+    save_json(path, index)
+
+
+def walk_images(root=PROJECT_ROOT):
+    """Yields image paths relative to `root`, using forward slashes. Skips generated outputs."""
+    skip = generated_dirs()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames
+                       if d not in SKIP_DIRS and os.path.normpath(os.path.join(dirpath, d)) not in skip]
+        for name in filenames:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                rel = os.path.relpath(os.path.join(dirpath, name), root)
+                yield rel.replace(os.sep, '/')
+
+
+def read_header(full_path):
+    """Reads format, mode and size without decoding pixel data."""
+    with Image.open(full_path) as img:
+        return {"format": img.format, "mode": img.mode, "width": img.width, "height": img.height}
+
+
+def inspect(index, rel_path, need_pixels=False, root=PROJECT_ROOT):
+    """
+    Returns the up-to-date index entry for `rel_path`.
+    Decodes the image only when `need_pixels` is set and stats are not cached.
+    """
+    full_path = os.path.join(root, rel_path)
+    st = os.stat(full_path)
+    files = index["files"]
+    entry = files.get(rel_path)
+
+    if entry is None or entry["mtime"] != st.st_mtime or entry["bytes"] != st.st_size:
+        digest = file_sha256(full_path)
+        if entry is None or entry.get("sha256") != digest:
+            entry = {"sha256": digest, **read_header(full_path)}
+        entry["mtime"] = st.st_mtime
+        entry["bytes"] = st.st_size
+        files[rel_path] = entry
+
+    if need_pixels and "bbox" not in entry:
+        entry.update(pixel_stats(full_path))
+
+    return entry
+
+
+def pixel_stats(full_path):
+    """Decodes the image and computes content bbox and alpha coverage."""
+    with Image.open(full_path) as img:
+        if 'A' not in img.getbands():
+            bbox = img.getbbox()
+            return {"bbox": list(bbox) if bbox else None, "opaqueRatio": 1.0}
+        alpha = np.asarray(img.getchannel('A'))
+
+    visible = alpha > 0
+    rows = np.flatnonzero(visible.any(axis=1))
+    cols = np.flatnonzero(visible.any(axis=0))
+    bbox = None
+    if rows.size:
+        bbox = [int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1]
+    return {"bbox": bbox, "opaqueRatio": round(float((alpha == 255).mean()), 4)}
+
+
+def scan(index, root=PROJECT_ROOT):
+    """Refreshes header info for every image and drops entries for deleted files."""
+    seen = set()
+    for rel_path in walk_images(root):
+        try:
+            inspect(index, rel_path, root=root)
+            seen.add(rel_path)
+        except Exception as e:
+            print(f"Error reading {rel_path}: {e}")
+    for stale in set(index["files"]) - seen:
+        del index["files"][stale]
+    return sorted(seen)
+
+
+def report_dims(index, paths):
+    for p in paths:
+        e = inspect(index, p)
+        ratio = e["width"] / e["height"] if e["height"] > 0 else 0
+        print(f"{p}: {e['width']}x{e['height']} (Aspect: {ratio:.2f})")
+
+
+def report_bbox(index, paths):
+    print(f"{'File':<40} {'Size':<12} {'BBox':<24} {'Content Height'}")
+    print("-" * 90)
+    for p in paths:
+        e = inspect(index, p, need_pixels=True)
+        size = f"({e['width']}, {e['height']})"
+        if e["bbox"]:
+            bbox = tuple(e["bbox"])
+            print(f"{p:<40} {size:<12} {str(bbox):<24} {bbox[3] - bbox[1]}")
+        else:
+            print(f"{p:<40} {size:<12} {'Empty':<24} 0")
+
+
+def report_padding(index, paths):
+    for p in paths:
+        e = inspect(index, p, need_pixels=True)
+        width, height = e["width"], e["height"]
+        if not e["bbox"]:
+            print(f"{p}: Empty image")
+            continue
+        left, top, right, bottom = e["bbox"]
+        h_padding = (left + (width - right)) / width * 100
+        v_padding = (top + (height - bottom)) / height * 100
+        print(f"{p}: Size({width}x{height}) Content({right - left}x{bottom - top}) "
+              f"Padding(H:{h_padding:.1f}%, V:{v_padding:.1f}%)")
+
+
+REPORTS = {
+    "dims": report_dims,
+    "bbox": report_bbox,
+    "padding": report_padding,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect image assets via an incremental index.")
+    parser.add_argument("report", choices=["scan", *REPORTS], help="Report to print")
+    parser.add_argument("--glob", default="*", help="Filter paths (relative to project root)")
+    args = parser.parse_args()
+
+    index = load_index()
+    paths = [p for p in scan(index) if fnmatch.fnmatch(p, args.glob)]
+    print(f"Indexed {len(index['files'])} images, {len(paths)} matching '{args.glob}'")
+
+    if args.report in REPORTS:
+        REPORTS[args.report](index, paths)
+
+    save_index(index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Deferred Module Imports
+The asset tools share one CLI (asset_tools.py), so numpy / Pillow should only
+load when a code path actually touches them, not for --help, header-only
+checks or no-op incremental builds.
+
+    np = lazy_import("numpy")   # nothing imported yet
+    np.zeros(3)                 # numpy loads here, on first attribute access
+
+LazyLoader is not thread-safe before Python 3.12: threads touching a module
+that is still lazy at the same moment can see a half-initialized module.
+Code that hands lazy modules to worker threads calls preload() first.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Returns module `name`, executing it on first attribute access (stdlib LazyLoader)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def preload(*names):
+    """Finishes loading modules `names` now, e.g. before worker threads share them."""
+    for name in names:
+        module = lazy_import(name)
+        getattr(module, "__name__")  # any attribute access completes a lazy load
@@ -0,0 +1,144 @@
+"""
+Icon Palette Quantizer
+Converts flat-shaded UI icons to 8-bit palette PNGs with alpha when the
+result stays within a perceptual error threshold; otherwise the full-color
+file is kept. Runs in parallel and reports per-file byte savings and error.
+
+Error is CIE76 delta-E between the original and the quantized icon, each
+composited over black and over white (HUD art is shown on both) and
+low-passed with a 3x3 box filter so dithering is judged the way the eye
+averages it, measured over visible pixels. An icon is converted when the
+95th-percentile delta-E is within --threshold and the palette file is smaller.
+
+Usage:
+    python quantize_icons.py [ui_icons/*.png ...] [--threshold 3.0] [--dry-run]
+"""
+import argparse
+import concurrent.futures
+import glob
+import io
+import os
+
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+DEFAULT_PATTERN = "ui_icons/*.png"
+
+
+def srgb_to_lab(rgb):
+    """Vectorized sRGB (0-1 floats, (..., 3)) -> CIELAB (D65)."""
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array([
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505],
+    ]).T
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def box_blur3(rgb):
+    """3x3 mean filter over an (H, W, 3) array with edge padding."""
+    padded = np.pad(rgb, ((1, 1), (1, 1), (0, 0)), mode='edge')
+    h, w = rgb.shape[:2]
+    return sum(padded[dy:dy + h, dx:dx + w] for dy in range(3) for dx in range(3)) / 9.0
+
+
+def perceptual_error(original, quantized):
+    """Returns (mean, p95) delta-E over visible pixels, worst of black/white backdrops."""
+    a = np.asarray(original, dtype=np.float32) / 255.0
+    b = np.asarray(quantized.convert('RGBA'), dtype=np.float32) / 255.0
+    visible = np.maximum(a[..., 3], b[..., 3]) > 0
+    if not visible.any():
+        return 0.0, 0.0
+
+    worst = None
+    for backdrop in (0.0, 1.0):
+        comp_a = box_blur3(a[..., :3] * a[..., 3:] + backdrop * (1 - a[..., 3:]))
+        comp_b = box_blur3(b[..., :3] * b[..., 3:] + backdrop * (1 - b[..., 3:]))
+        delta_e = np.linalg.norm(srgb_to_lab(comp_a[visible]) - srgb_to_lab(comp_b[visible]), axis=-1)
+        worst = delta_e if worst is None else np.maximum(worst, delta_e)
+    return float(worst.mean()), float(np.percentile(worst, 95))
+
+
+def quantize_rgba(img, colors=256):
+    """8-bit palette with alpha; prefers libimagequant when Pillow is built with it."""
+    try:
+        return img.quantize(colors=colors, method=Image.Quantize.LIBIMAGEQUANT)
+    except (ValueError, OSError):
+        return img.quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+
+
+def process_icon(path, threshold, dry_run):
+    """Quantizes one icon. Runs in a worker process."""
+    original_bytes = os.path.getsize(path)
+    with Image.open(path) as img:
+        if img.mode == 'P':
+            return {"path": path, "status": "palette", "before": original_bytes, "after": original_bytes}
+        rgba = img.convert('RGBA')
+
+    quantized = quantize_rgba(rgba)
+    mean_de, p95_de = perceptual_error(rgba, quantized)
+
+    buf = io.BytesIO()
+    quantized.save(buf, format='PNG', optimize=True)
+    new_bytes = buf.tell()
+
+    result = {"path": path, "before": original_bytes, "after": original_bytes,
+              "mean_de": mean_de, "p95_de": p95_de}
+    if p95_de > threshold:
+        result["status"] = "full-color (error)"
+    elif new_bytes >= original_bytes:
+        result["status"] = "full-color (no gain)"
+    else:
+        result["status"] = "would quantize" if dry_run else "quantized"
+        result["after"] = new_bytes
+        if not dry_run:
+            with open(path, 'wb') as f:
+                f.write(buf.getvalue())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize UI icons to 8-bit palettes where lossless enough.")
+    parser.add_argument("images", nargs="*", default=[DEFAULT_PATTERN], help="Images or glob patterns")
+    parser.add_argument("--threshold", type=float, default=3.0, help="Max 95th-percentile delta-E")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing files")
+    args = parser.parse_args()
+
+    files = sorted({f for pattern in args.images for f in (glob.glob(pattern) or [pattern])})
+    print(f"Found {len(files)} images to process.")
+    print(f"{'File':<40} {'Before':>9} {'After':>9} {'Saved':>6} {'dE mean':>8} {'dE p95':>7}  Result")
+    print("-" * 100)
+
+    total_before = total_after = 0
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        futures = {executor.submit(process_icon, f, args.threshold, args.dry_run): f for f in files}
+        results = []
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error processing {futures[future]}: {e}")
+
+    for r in sorted(results, key=lambda r: r["path"]):
+        total_before += r["before"]
+        total_after += r["after"]
+        saved = (1 - r["after"] / r["before"]) * 100 if r["before"] else 0
+        de = f"{r['mean_de']:>8.2f} {r['p95_de']:>7.2f}" if "mean_de" in r else f"{'-':>8} {'-':>7}"
+        print(f"{os.path.basename(r['path']):<40} {r['before']:>9} {r['after']:>9} {saved:>5.0f}% {de}  {r['status']}")
+
+    if total_before:
+        print(f"\nTotal: {total_before / 1024:.0f} KB -> {total_after / 1024:.0f} KB "
+              f"({(1 - total_after / total_before) * 100:.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
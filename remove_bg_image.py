@@ -1,8 +1,11 @@
 
 import sys
 import os
-import numpy as np
-from PIL import Image
+
+from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
 
 def remove_white_background(input_path, output_path, threshold=230):
     """
@@ -57,7 +60,7 @@ def remove_white_background(input_path, output_path, threshold=230):
         print(f"Error processing image: {e}")
         return False
 
-if __name__ == "__main__":
+def main():
     if len(sys.argv) < 2:
         print("Usage: python remove_bg_image.py <input_file> [output_file]")
         sys.exit(1)
@@ -70,3 +73,6 @@ if __name__ == "__main__":
         output_file = f"{base}_transparent.png"
         
     remove_white_background(input_file, output_file)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Scene Tile Pyramid
+Cuts a scene into fixed-size WebP tiles at every halving zoom level, so the
+client can stream only the tiles around the viewport instead of holding the
+whole 2784x3456 texture (and its smaller variants) in GPU memory.
+
+- Levels come from the same successive-halving chain as the resolution
+  tiers, down to the first level that fits in a single tile.
+- Fully transparent tiles are not written (index entry null), uniform tiles
+  are stored as their color ("#rrggbbaa") for the client to fill.
+- The remaining tiles are content-addressed (<hash>.webp) in one shared
+  directory, so repeated content within a scene and identical scenes
+  (the underground floors) are encoded and stored once.
+
+Each scene gets an index (tiles/<stem>.json):
+    {"tileSize": 512, "width": .., "height": .., "levels": [
+        {"scale": 1.0, "width": .., "height": .., "cols": .., "rows": ..,
+         "tiles": [<file> | "#rrggbbaa" | null, ...]},   # row-major
+        ...]}
+Tile (col, row) of a level covers x = col * tileSize, y = row * tileSize;
+edge tiles are cropped to the level size, not padded.
+"""
+import hashlib
+import os
+import threading
+
+from asset_cache import load_json, save_json
+from lazy_import import lazy_import
+from texture_tiers import halving_chain
+
+Image = lazy_import("PIL.Image")
+
+TILE_DIR_NAME = "tiles"
+TILE_SIZE = 512
+
+
+def index_filename(stem):
+    return f"{stem}.json"
+
+
+def pyramid_scales(width, height, tile_size=TILE_SIZE):
+    """1.0, 0.5, ... down to the first scale at which the image fits in one tile."""
+    scales = [1.0]
+    while max(width, height) * scales[-1] > tile_size:
+        scales.append(scales[-1] / 2)
+    return scales
+
+
+def tile_entry(tile, tiles_dir, quality, method):
+    """Index entry for one tile: null, a uniform color, or a content-addressed file."""
+    extrema = tile.getextrema()
+    if extrema[3][1] == 0:
+        return None
+    if all(lo == hi for lo, hi in extrema):
+        return "#" + "".join(f"{lo:02x}" for lo, _ in extrema)
+
+    digest = hashlib.sha1(f"{tile.width}x{tile.height}".encode() + tile.tobytes()).hexdigest()[:16]
+    name = f"{digest}.webp"
+    path = os.path.join(tiles_dir, name)
+    if not os.path.exists(path):
+        # Scenes render in parallel threads and may share tiles: write, then rename into place
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        tile.save(tmp_path, format='WEBP', quality=quality, method=method)
+        os.replace(tmp_path, path)
+    return name
+
+
+def save_tile_pyramid(image, output_dir, stem, tile_size=TILE_SIZE, quality=85, method=4):
+    """
+    Writes the tiles of every zoom level of `image` to <output_dir>/tiles/ and
+    the scene index to tiles/<stem>.json. Returns the index.
+    """
+    tiles_dir = os.path.join(output_dir, TILE_DIR_NAME)
+    os.makedirs(tiles_dir, exist_ok=True)
+    image = image.convert('RGBA')
+
+    levels = []
+    for scale, level in halving_chain(image, pyramid_scales(image.width, image.height, tile_size)):
+        cols, rows = -(-level.width // tile_size), -(-level.height // tile_size)
+        tiles = []
+        for row in range(rows):
+            for col in range(cols):
+                x, y = col * tile_size, row * tile_size
+                tile = level.crop((x, y, min(x + tile_size, level.width), min(y + tile_size, level.height)))
+                tiles.append(tile_entry(tile, tiles_dir, quality, method))
+        levels.append({"scale": scale, "width": level.width, "height": level.height,
+                       "cols": cols, "rows": rows, "tiles": tiles})
+
+    index = {"tileSize": tile_size, "width": image.width, "height": image.height, "levels": levels}
+    save_json(os.path.join(tiles_dir, index_filename(stem)), index)
+    return index
+
+
+def describe_tiles(output_dir, stem):
+    """Summary of a scene's tile pyramid for manifests, or None if it has none."""
+    index = load_json(os.path.join(output_dir, TILE_DIR_NAME, index_filename(stem)))
+    if not index:
+        return None
+    entries = [t for level in index["levels"] for t in level["tiles"]]
+    files = {t for t in entries if t and not t.startswith("#")}
+    return {
+        "index": f"{TILE_DIR_NAME}/{index_filename(stem)}",
+        "tileSize": index["tileSize"],
+        "levels": len(index["levels"]),
+        "tiles": len(entries),
+        "files": len(files),
+        "bytes": sum(os.path.getsize(os.path.join(output_dir, TILE_DIR_NAME, f)) for f in files),
+    }
+
+
+def prune_tiles(output_dir):
+    """Deletes tile files that no scene index refers to any more. Returns the count removed."""
+    tiles_dir = os.path.join(output_dir, TILE_DIR_NAME)
+    if not os.path.isdir(tiles_dir):
+        return 0
+    names = os.listdir(tiles_dir)
+    referenced = set()
+    for name in names:
+        if name.endswith(".json"):
+            index = load_json(os.path.join(tiles_dir, name))
+            referenced.update(t for level in index.get("levels", []) for t in level["tiles"] if t)
+    removed = 0
+    for name in names:
+        if name.endswith(".webp") and name not in referenced:
+            os.remove(os.path.join(tiles_dir, name))
+            removed += 1
+    return removed
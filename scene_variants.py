@@ -0,0 +1,77 @@
+"""
+Progressive Scene Variants
+Writes a scene texture as a tiny blurred placeholder, a half-resolution
+variant and the full variant, all derived from one decoded image, so the
+preloader can show the bunker immediately and swap in detail progressively.
+With `tiers`, a quarter-resolution tier is added from the same halving chain.
+"""
+import os
+
+from lazy_import import lazy_import
+from texture_tiers import halving_chain, tier_filename, tier_info
+
+Image = lazy_import("PIL.Image")
+ImageFilter = lazy_import("PIL.ImageFilter")
+
+LQIP_WIDTH = 48
+LQIP_BLUR = 2
+LQIP_QUALITY = 40
+
+# Variant name -> resolution scale (None = placeholder), smallest first
+VARIANTS = {
+    "lqip": None,
+    "quarter": 0.25,
+    "half": 0.5,
+    "full": 1.0,
+}
+
+
+def variant_filename(stem, variant):
+    scale = VARIANTS[variant]
+    if scale is None:
+        return f"{stem}_lqip.webp"
+    return tier_filename(stem, scale, ".webp")
+
+
+def required_variants(tiers=False):
+    return [v for v in VARIANTS if tiers or v != "quarter"]
+
+
+def save_variants(image, output_dir, stem, quality=85, method=4, tiers=False):
+    """
+    Saves lqip / half / full (and quarter with `tiers`) WebP variants of `image`.
+    Smaller variants come from a successive-halving chain over the full image
+    and the placeholder from the smallest tier, so nothing is decoded twice.
+    Returns describe_variants() for the written files.
+    """
+    scales = [1.0, 0.5, 0.25] if tiers else [1.0, 0.5]
+    smallest = image
+    for scale, tier in halving_chain(image, scales):
+        tier.save(os.path.join(output_dir, tier_filename(stem, scale, ".webp")),
+                  format='WEBP', quality=quality, method=method)
+        smallest = tier
+
+    lqip_h = max(1, round(smallest.height * LQIP_WIDTH / smallest.width))
+    lqip = smallest.resize((LQIP_WIDTH, lqip_h), Image.Resampling.BILINEAR).filter(ImageFilter.GaussianBlur(LQIP_BLUR))
+    lqip.save(os.path.join(output_dir, variant_filename(stem, "lqip")), format='WEBP', quality=LQIP_QUALITY)
+
+    return describe_variants(output_dir, stem)
+
+
+def describe_variants(output_dir, stem):
+    """
+    Returns {variant: {file, width, height, bytes, ...}} for the variants present
+    on disk (header reads only). Resolution tiers also carry tier metadata.
+    """
+    variants = {}
+    for variant, scale in VARIANTS.items():
+        path = os.path.join(output_dir, variant_filename(stem, variant))
+        if not os.path.exists(path):
+            continue
+        with Image.open(path) as img:
+            if scale is None:
+                variants[variant] = {"file": os.path.basename(path), "width": img.width,
+                                     "height": img.height, "bytes": os.path.getsize(path)}
+            else:
+                variants[variant] = tier_info(scale, path, img)
+    return variants
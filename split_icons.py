@@ -1,69 +1,144 @@
-from PIL import Image
+"""
+Icon Sheet Splitter
+Splits generated icon sheets into individual icons with transparent backgrounds.
+
+Cell boundaries are found automatically from row/column projections of the
+content mask (opaque, non-dark pixels), so any N x M grid works. Black keying
+and trimming are done with NumPy. Many sheets can be processed in one run.
+
+Usage:
+    python split_icons.py sheet1.png [sheet2.png ...] [--out ui_icons]
+                          [--names icon_cash,icon_food,...] [--dark 30]
+"""
+import argparse
+import concurrent.futures
 import os
 
-def split_icons():
-    base_dir = r"C:\Users\boyan.iliev\.gemini\antigravity\brain\d0a3be16-dc5a-4276-8a26-a3e49aebb2d6"
-    output_dir = r"d:\Work\ApoNow2\ui_icons"
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # File paths
-    resource_sheet = os.path.join(base_dir, "hud_resource_icons_1769189876958.png")
-    action_sheet = os.path.join(base_dir, "hud_action_icons_1769189904725.png")
-
-    def process_sheet(path, names):
-        try:
-            img = Image.open(path).convert("RGBA")
-            width, height = img.size
-            cell_w = width // 2
-            cell_h = height // 2
-            
-            # 2x2 grid
-            coords = [
-                (0, 0, cell_w, cell_h),          # Top-Left
-                (cell_w, 0, width, cell_h),      # Top-Right
-                (0, cell_h, cell_w, height),     # Bottom-Left
-                (cell_w, cell_h, width, height)  # Bottom-Right
-            ]
-            
-            for i, name in enumerate(names):
-                if i >= len(coords): break
-                box = coords[i]
-                icon = img.crop(box)
-                
-                # Trim black borders/background roughly? 
-                # Ideally we want to make black transparent.
-                # Let's do a simple black removal
-                data = icon.getdata()
-                new_data = []
-                for item in data:
-                    # If pixel is very dark, make transparent
-                    if item[0] < 30 and item[1] < 30 and item[2] < 30:
-                        new_data.append((0, 0, 0, 0))
-                    else:
-                        new_data.append(item)
-                icon.putdata(new_data)
-                
-                # Auto-crop to content
-                bbox = icon.getbbox()
-                if bbox:
-                    icon = icon.crop(bbox)
-                
-                save_path = os.path.join(output_dir, f"{name}.png")
-                icon.save(save_path)
-                print(f"Saved {save_path}")
-                
-        except Exception as e:
-            print(f"Error processing {path}: {e}")
-
-    # Resource names (TL, TR, BL, BR based on image usually)
-    # Image 1: Coin(TL), Bread(TR), Wheat(BL), Energy(BR)
-    process_sheet(resource_sheet, ["icon_cash", "icon_food", "icon_wheat", "icon_energy"])
-    
-    # Image 2: Hammer(TL), Pause(TR), Settings(BL), Map(BR)
-    # Actually checking the generated image 2: Hammer(TL), Pause(TR), Settings(BL), Map(BR) seems likely
-    process_sheet(action_sheet, ["icon_build", "icon_pause", "icon_settings", "icon_map"])
+from lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+np = lazy_import("numpy")
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Known sheets -> icon names in reading order (left-to-right, top-to-bottom)
+# Image 1: Coin(TL), Bread(TR), Wheat(BL), Energy(BR)
+# Image 2: Hammer(TL), Pause(TR), Settings(BL), Map(BR)
+SHEET_NAMES = {
+    "hud_resource_icons_1769189876958.png": ["icon_cash", "icon_food", "icon_wheat", "icon_energy"],
+    "hud_action_icons_1769189904725.png": ["icon_build", "icon_pause", "icon_settings", "icon_map"],
+}
+
+
+def content_mask(data, dark_threshold=30):
+    """Pixels that belong to an icon: not transparent and not near-black."""
+    rgb = data[:, :, :3]
+    dark = np.all(rgb < dark_threshold, axis=2)
+    return (data[:, :, 3] > 0) & ~dark
+
+
+def find_bands(projection, min_gap, min_pixels):
+    """
+    Returns [(start, end), ...] runs of a 1-D projection that contain content.
+    Gaps shorter than `min_gap` are treated as part of the surrounding band.
+    """
+    filled = projection >= min_pixels
+    if not filled.any():
+        return []
+
+    # Edges of filled runs: +1 where a run starts, -1 where it ends
+    padded = np.concatenate(([False], filled, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    bands = [[starts[0], ends[0]]]
+    for s, e in zip(starts[1:], ends[1:]):
+        if s - bands[-1][1] < min_gap:
+            bands[-1][1] = e
+        else:
+            bands.append([s, e])
+    return [(int(s), int(e)) for s, e in bands]
+
+
+def detect_grid(mask, gap_ratio=0.01, noise_ratio=0.002):
+    """Returns (row_bands, col_bands) for the sheet's content mask."""
+    h, w = mask.shape
+    row_bands = find_bands(mask.sum(axis=1), max(2, int(h * gap_ratio)), max(1, int(w * noise_ratio)))
+    col_bands = find_bands(mask.sum(axis=0), max(2, int(w * gap_ratio)), max(1, int(h * noise_ratio)))
+    return row_bands, col_bands
+
+
+def split_sheet(path, output_dir, names=None, dark_threshold=30):
+    """Splits one sheet. Returns list of saved icon paths."""
+    img = Image.open(path).convert("RGBA")
+    data = np.array(img)
+    mask = content_mask(data, dark_threshold)
+
+    # Make near-black background transparent
+    data[~mask] = 0
+
+    row_bands, col_bands = detect_grid(mask)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    print(f"{os.path.basename(path)}: {len(row_bands)}x{len(col_bands)} grid")
+
+    saved = []
+    index = 0
+    for r, (y0, y1) in enumerate(row_bands):
+        for c, (x0, x1) in enumerate(col_bands):
+            cell_mask = mask[y0:y1, x0:x1]
+            rows = np.flatnonzero(cell_mask.any(axis=1))
+            cols = np.flatnonzero(cell_mask.any(axis=0))
+            if rows.size == 0:
+                continue
+
+            # Auto-crop to content
+            top, bottom = y0 + rows[0], y0 + rows[-1] + 1
+            left, right = x0 + cols[0], x0 + cols[-1] + 1
+            icon = Image.fromarray(data[top:bottom, left:right])
+
+            if names and index < len(names):
+                name = names[index]
+            else:
+                name = f"{stem}_r{r}_c{c}"
+            index += 1
+
+            save_path = os.path.join(output_dir, f"{name}.png")
+            icon.save(save_path)
+            saved.append(save_path)
+            print(f"Saved {save_path}")
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split icon sheets into individual icons.")
+    parser.add_argument("sheets", nargs="+", help="Icon sheet images")
+    parser.add_argument("--out", default="ui_icons", help="Output directory relative to the project root (default: ui_icons)")
+    parser.add_argument("--names", help="Comma-separated icon names (single sheet only)")
+    parser.add_argument("--dark", type=int, default=30, help="Near-black threshold (0-255)")
+    args = parser.parse_args()
+
+    out_dir = os.path.join(PROJECT_ROOT, args.out)
+    os.makedirs(out_dir, exist_ok=True)
+    explicit_names = args.names.split(",") if args.names else None
+    if explicit_names and len(args.sheets) > 1:
+        parser.error("--names can only be used with a single sheet")
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(
+                split_sheet, path, out_dir,
+                explicit_names or SHEET_NAMES.get(os.path.basename(path)),
+                args.dark,
+            ): path
+            for path in args.sheets
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error processing {futures[future]}: {e}")
+
 
 if __name__ == "__main__":
-    split_icons()
+    main()
@@ -6,6 +6,10 @@ export const CONFIG = {
     // Map settings
     mapPath: 'New_maps/scene_', // Base path for dynamic loading (e.g., scene_1.png)
 
+    // Asset pack with content-hashed URLs (generated by asset_pack.py), e.g. 'dist/asset-pack.json'
+    // null = load assets individually from their source paths
+    assetPackPath: null,
+
     // Character settings
     characterPath: 'characters/Normal_optimized-removebg-preview.png',
     characterScale: 0.70,
@@ -1665,10 +1665,21 @@ export class GameScene extends Phaser.Scene {
                 if (this.anims.exists('garden_grow')) {
                     this.anims.remove('garden_grow');
                 }
+                const meta = this.cache.json.get('garden_anim_meta');
+                // Only the first totalFrames cells hold frames; trailing grid cells are blank
+                let frames = this.anims.generateFrameNumbers('garden_anim', meta ? { start: 0, end: meta.totalFrames - 1 } : {});
+                let frameRate = 12;
+                if (meta && meta.durations && meta.durations.length === frames.length) {
+                    // Motion-sampled sheet: hold each frame for its recorded time.
+                    // Phaser adds frame.duration on top of 1000 / frameRate.
+                    const base = Math.min(...meta.durations);
+                    frameRate = 1000 / base;
+                    frames = frames.map((frame, i) => ({ ...frame, duration: meta.durations[i] - base }));
+                }
                 this.anims.create({
                     key: 'garden_grow',
-                    frames: this.anims.generateFrameNumbers('garden_anim'),
-                    frameRate: 12,
+                    frames: frames,
+                    frameRate: frameRate,
                     repeat: -1  // Loop forever
                 });
 
@@ -41,7 +41,15 @@ export class PreloadScene extends Phaser.Scene {
         });
 
         // Load Assets
-        // Load Assets
+        if (CONFIG.assetPackPath) {
+            // Same texture keys, served from immutable content-hashed URLs
+            this.load.pack('asset_pack', CONFIG.assetPackPath, 'main');
+        } else {
+            this.loadAssets();
+        }
+    }
+
+    loadAssets() {
         // Dynamic Map Components
         this.load.image('room_base', 'assets/map_components/room_base.png');
         this.load.image('room_entrance', 'assets/map_components/room_entrance.png');
@@ -110,6 +118,8 @@ export class PreloadScene extends Phaser.Scene {
             frameWidth: 921,
             frameHeight: 1080
         });
+        // Per-frame durations from the motion-adaptive sampler (video_to_spritesheet.py)
+        this.load.json('garden_anim_meta', 'Objects/Cutscenes/Garden/garden_anim_meta.json');
     }
 
     create() {
@@ -0,0 +1,62 @@
+import glob
+import os
+
+import pytest
+
+from analyze_icons import RESOURCE_OVERRIDES, assign_resources, classify_files, classify_resource, icon_key
+
+UI_ICONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui_icons")
+
+
+@pytest.fixture(scope="module")
+def ui_icons():
+    """Classifications of the real ui_icons/ set: resource icons on a shared panel, buttons, grey icons."""
+    files = sorted(glob.glob(os.path.join(UI_ICONS, "*.png")))
+    return classify_files(files, {})
+
+
+def by_name(resources):
+    return {icon_key(f): resource for f, resource in resources.items()}
+
+
+def test_resource_icons_get_the_game_resources(ui_icons):
+    resources = by_name(assign_resources(ui_icons))
+    for name, resource in RESOURCE_OVERRIDES.items():
+        assert resources[name] == resource
+
+
+def test_each_resource_has_one_icon(ui_icons):
+    assigned = [r for r in assign_resources(ui_icons).values() if r is not None]
+    assert len(assigned) == len(set(assigned))
+
+
+def test_resources_taken_by_overrides_are_not_reassigned(ui_icons):
+    # icon_map is the only green icon, but caps belongs to icon_cash
+    assert by_name(assign_resources(ui_icons))["icon_map"] is None
+
+
+def test_classification_does_not_depend_on_the_batch(ui_icons):
+    for f, entry in ui_icons.items():
+        alone = classify_files([f], {})[f]
+        assert classify_resource(alone) == classify_resource(entry)
+
+
+def test_collision_keeps_the_best_scoring_icon(ui_icons):
+    # Without overrides the blue resource icons all classify as water
+    blue = {f: entry for f, entry in ui_icons.items()
+            if icon_key(f) in ("icon_water", "icon_cash", "icon_food", "day_counter", "btn_build")}
+    assert all(classify_resource(entry) == "water" for entry in blue.values())
+
+    resources = by_name(assign_resources(blue, overrides={}))
+    assert resources == {"icon_water": "water", "icon_cash": None, "icon_food": None,
+                         "day_counter": None, "btn_build": None}
+
+
+def test_failed_files_are_not_cached(tmp_path):
+    broken = tmp_path / "half_written.png"
+    broken.write_bytes(b"\x89PNG")
+    cache = {}
+    result = classify_files([str(broken)], cache)
+    assert result[str(broken)]["hue"].startswith("Error")
+    assert classify_resource(result[str(broken)]) is None
+    assert cache == {}
@@ -0,0 +1,67 @@
+import sys
+
+import pytest
+
+import build_assets
+
+# "a_pack" consumes what "z_render" writes, so it must run after it although it sorts first
+STEPS = [
+    {"name": "a_pack", "script": "build_assets.py", "args": [],
+     "inputs": ["build/z_render.out"], "config": [], "outputs": ["build/a_pack.out"]},
+    {"name": "z_render", "script": "build_assets.py", "args": [],
+     "inputs": [], "config": [], "outputs": ["build/z_render.out"]},
+]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_assets, "STEPS", STEPS)
+    monkeypatch.setattr(build_assets, "STATE_PATH", str(tmp_path / "state.json"))
+    monkeypatch.setattr(build_assets, "GRID_CONFIG_PATH", str(tmp_path / "grid_config.json"))
+    ran = []
+
+    def run_step(step):
+        ran.append(step["name"])
+        return 0, "", 0.0
+
+    monkeypatch.setattr(build_assets, "run_step", run_step)
+    monkeypatch.setattr(build_assets, "outputs_present", lambda step: step["name"] in ran)
+    return ran
+
+
+def build(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["build_assets.py", *args])
+    build_assets.main()
+
+
+def test_topological_order_puts_dependencies_first():
+    graph = build_assets.build_graph(STEPS)
+    assert graph == {"a_pack": {"z_render"}, "z_render": set()}
+    assert build_assets.topological_order(graph, set(graph)) == ["z_render", "a_pack"]
+
+
+def test_topological_order_rejects_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        build_assets.topological_order({"a": {"b"}, "b": {"a"}}, {"a", "b"})
+
+
+def test_dry_run_reaches_dependents_that_sort_first(pipeline, monkeypatch, capsys):
+    build(monkeypatch, "--dry-run")
+    out = capsys.readouterr().out
+    assert out.index("[would run] z_render") < out.index("[would run] a_pack")
+    assert "Blocked" not in out
+
+
+def test_dependent_runs_after_its_dependency(pipeline, monkeypatch):
+    build(monkeypatch)
+    assert pipeline == ["z_render", "a_pack"]
+
+
+def test_dependent_runs_when_its_dependency_is_up_to_date(pipeline, monkeypatch, capsys):
+    build(monkeypatch, "z_render")
+    capsys.readouterr()
+    build(monkeypatch)
+    out = capsys.readouterr().out
+    assert "[skip] z_render" in out
+    assert "[run]  a_pack" in out
+    assert pipeline == ["z_render", "a_pack"]
@@ -0,0 +1,21 @@
+from video_to_spritesheet import select_frames
+
+# Mostly still clip with one short burst of motion, like the elevator cutscene
+BURST = [0.0] * 40 + [100.0] * 3 + [0.0] * 50
+
+
+def test_select_frames_fills_the_budget_when_targets_collide():
+    for budget in (8, 16, 32, 64):
+        frames = select_frames(BURST, budget)
+        assert len(frames) == budget
+        assert frames == sorted(set(frames))
+        assert 0 <= frames[0] and frames[-1] < len(BURST)
+
+
+def test_select_frames_favors_motion():
+    frames = select_frames(BURST, 16)
+    assert set(range(40, 43)) <= set(frames)
+
+
+def test_select_frames_keeps_every_frame_of_a_short_clip():
+    assert select_frames([1.0] * 5, 8) == [0, 1, 2, 3, 4]
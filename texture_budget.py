@@ -0,0 +1,135 @@
+"""
+GPU Texture Memory Budget
+Estimates resident VRAM for everything PreloadScene loads plus the generated
+bunker scenes, and fails when a budget is exceeded.
+
+Each texture is counted as decoded RGBA (w x h x 4), optionally padded to
+power-of-two sizes (--pot) to model WebGL1 / mipmapped uploads. Videos count
+one RGBA frame texture. Preloaded textures stay resident for the whole game;
+one bunker scene texture (scene_N) is added on top of them at a time.
+
+Usage:
+    python texture_budget.py [--budget 256] [--pot] [--max-texture-size 4096] [--top 8]
+Exit code 1 when any scene exceeds the budget.
+"""
+import argparse
+import os
+import sys
+
+from asset_pack import parse_preload
+from compress_scenes import MAP_DIR, discover_scenes
+from inspect_assets import PROJECT_ROOT, inspect, load_index, save_index
+
+MB = 1024 * 1024
+
+
+def next_pot(n):
+    return 1 << (max(1, n) - 1).bit_length()
+
+
+def video_dims(full_path):
+    """Reads video frame size from the container header (requires PyAV)."""
+    import av
+    with av.open(full_path) as container:
+        stream = container.streams.video[0]
+        return stream.codec_context.width, stream.codec_context.height
+
+
+def texture_info(index, kind, key, rel_path, pot):
+    full_path = os.path.join(PROJECT_ROOT, rel_path)
+    info = {"kind": kind, "key": key, "path": rel_path, "width": None, "height": None, "bytes": 0}
+    if not os.path.exists(full_path):
+        info["error"] = "missing"
+        return info
+    try:
+        if kind == "video":
+            w, h = video_dims(full_path)
+        else:
+            entry = inspect(index, rel_path)
+            w, h = entry["width"], entry["height"]
+    except Exception as e:
+        info["error"] = str(e)
+        return info
+
+    alloc_w, alloc_h = (next_pot(w), next_pot(h)) if pot else (w, h)
+    info.update(width=w, height=h, bytes=alloc_w * alloc_h * 4)
+    return info
+
+
+def suggest_downscale(info, overage, max_texture_size):
+    """Linear scale factor for a texture, or None when it can stay as is."""
+    factor = 1.0
+    longest = max(info["width"], info["height"])
+    if longest > max_texture_size:
+        factor = max_texture_size / longest
+    if overage > 0:
+        # Smallest step that frees the remaining overage (bytes scale with factor^2)
+        for step in (0.75, 0.5, 0.25):
+            if info["bytes"] * (1 - step * step) >= overage or step == 0.25:
+                factor = min(factor, step)
+                break
+    return factor if factor < 1.0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report GPU texture memory per scene.")
+    parser.add_argument("--budget", type=float, default=256, help="VRAM budget in MB (default: 256)")
+    parser.add_argument("--pot", action="store_true", help="Pad textures to power-of-two sizes")
+    parser.add_argument("--max-texture-size", type=int, default=4096, help="Largest safe texture side")
+    parser.add_argument("--top", type=int, default=8, help="Number of offenders to list")
+    args = parser.parse_args()
+
+    index = load_index()
+    preload = [texture_info(index, e["type"], e["key"], e["url"], args.pot)
+               for e in parse_preload() if e["type"] != "json"]
+    map_rel = os.path.relpath(MAP_DIR, PROJECT_ROOT).replace(os.sep, '/')
+    scenes = [
+        texture_info(index, "scene", os.path.splitext(webp)[0], f"{map_rel}/{webp}", args.pot)
+        for _, webp in discover_scenes()
+    ]
+    save_index(index)
+
+    for info in preload + scenes:
+        if "error" in info:
+            print(f"WARN: {info['key']} ({info['path']}): {info['error']}")
+
+    shared = sum(t["bytes"] for t in preload)
+    budget = args.budget * MB
+    print(f"\nPreloaded textures: {len(preload)}, resident {shared / MB:.1f} MB")
+    print(f"{'Scene':<12} {'Texture':>10} {'Total':>10}  Status")
+    print("-" * 48)
+
+    over_budget = False
+    worst_total = shared
+    for scene in scenes:
+        total = shared + scene["bytes"]
+        worst_total = max(worst_total, total)
+        status = "OK" if total <= budget else "OVER"
+        over_budget |= total > budget
+        print(f"{scene['key']:<12} {scene['bytes'] / MB:>8.1f}MB {total / MB:>8.1f}MB  {status}")
+
+    # Offenders: preloaded textures plus the largest scene (only one scene is resident at a time)
+    # Missing or unreadable textures (bytes == 0, no dimensions) are only warned about above
+    candidates = [t for t in preload if t["bytes"]]
+    present_scenes = [t for t in scenes if t["bytes"]]
+    if present_scenes:
+        candidates.append(max(present_scenes, key=lambda t: t["bytes"]))
+    offenders = sorted(candidates, key=lambda t: t["bytes"], reverse=True)[:args.top]
+    overage = worst_total - budget
+
+    print(f"\nBiggest textures (budget {args.budget:.0f} MB, worst scene {worst_total / MB:.1f} MB):")
+    for t in offenders:
+        factor = suggest_downscale(t, overage, args.max_texture_size)
+        hint = f" -> suggest x{factor:.2f}" if factor else ""
+        print(f"  {t['bytes'] / MB:>7.1f} MB  {t['width']}x{t['height']}  {t['key']} ({t['path']}){hint}")
+        if factor:
+            overage -= t["bytes"] * (1 - factor * factor)
+
+    if over_budget:
+        print("\nFAIL: texture memory exceeds budget")
+        sys.exit(1)
+    print("\nPASS: within budget")
+
+
+if __name__ == "__main__":
+    main()
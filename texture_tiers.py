@@ -0,0 +1,118 @@
+"""
+Multi-Resolution Texture Tiers
+Produces 1x / 0.5x / 0.25x versions of a texture from a single decoded image
+using a successive-halving resample chain (each tier is resampled from the
+previous one, not from the full image).
+
+Per-tier metadata lets the game pick a tier from device pixel ratio and
+memory class: use the smallest tier whose width still covers
+viewportWidth * devicePixelRatio, capped by the tier allowed for the device's
+memory class.
+
+Usage (standalone, e.g. for icons):
+    python texture_tiers.py ui_icons/*.png [--out ui_icons/tiers] [--index tiers.json]
+"""
+import argparse
+import glob
+import os
+
+from asset_cache import save_json
+from lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+
+TIER_SCALES = (1.0, 0.5, 0.25)
+
+# Most detailed tier each memory class should load
+MEMORY_CLASS_BY_SCALE = {
+    1.0: "high",
+    0.5: "medium",
+    0.25: "low",
+}
+
+
+def tier_filename(stem, scale, ext):
+    """1x keeps the original name; smaller tiers get an @<scale>x suffix."""
+    if scale == 1.0:
+        return f"{stem}{ext}"
+    return f"{stem}@{scale:g}x{ext}"
+
+
+def halving_chain(image, scales=TIER_SCALES, size_for=None):
+    """
+    Yields (scale, image) for each requested scale, halving successively.
+    `size_for(scale)` may override the target size (e.g. to keep spritesheet
+    frames on exact multiples); by default it is the full size times scale.
+    """
+    current = image
+    current_scale = 1.0
+    for scale in sorted(scales, reverse=True):
+        while current_scale / 2 >= scale:
+            current_scale /= 2
+            w, h = size_for(current_scale) if size_for else (
+                max(1, int(image.width * current_scale)), max(1, int(image.height * current_scale)))
+            current = current.resize((w, h), Image.Resampling.BOX)
+        yield scale, current
+
+
+def tier_info(scale, path, image):
+    return {
+        "scale": scale,
+        "file": os.path.basename(path),
+        "width": image.width,
+        "height": image.height,
+        "bytes": os.path.getsize(path),
+        "gpuBytes": image.width * image.height * 4,
+        "memoryClass": MEMORY_CLASS_BY_SCALE.get(scale, "low"),
+    }
+
+
+def save_tiers(image, output_dir, stem, ext=".png", scales=TIER_SCALES, size_for=None, skip=(), **save_kwargs):
+    """
+    Saves every tier of `image` and returns their metadata, largest first.
+    Scales listed in `skip` are resampled (to feed the chain) but not written.
+    """
+    tiers = []
+    for scale, tier in halving_chain(image, scales, size_for):
+        if scale in skip:
+            continue
+        path = os.path.join(output_dir, tier_filename(stem, scale, ext))
+        tier.save(path, **save_kwargs)
+        tiers.append(tier_info(scale, path, tier))
+    return tiers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write 1x/0.5x/0.25x tiers of images.")
+    parser.add_argument("images", nargs="+", help="Images or glob patterns")
+    parser.add_argument("--out", default=None, help="Output directory (default: next to each image)")
+    parser.add_argument("--index", default=None, help="Write tier metadata JSON here")
+    args = parser.parse_args()
+
+    files = sorted({f for pattern in args.images for f in (glob.glob(pattern) or [pattern])})
+    index = {}
+    for path in files:
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if "@" in stem:
+            continue  # Already a tier
+        output_dir = args.out or os.path.dirname(path)
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                # 1x is the source itself; only the smaller tiers are written
+                tiers = save_tiers(img, output_dir, stem, ext, skip=(1.0,))
+                tiers.insert(0, tier_info(1.0, path, img))
+        except Exception as e:
+            print(f"Error processing {path}: {e}")
+            continue
+        index[stem] = tiers
+        print(f"{path}: " + ", ".join(f"{t['scale']:g}x {t['width']}x{t['height']}" for t in tiers))
+
+    if args.index:
+        save_json(args.index, index)
+        print(f"Tier index saved: {args.index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,190 @@
 Video to Sprite Sheet Converter with Chroma Key
 Extracts frames from video, removes white background, creates a sprite sheet.
 This allows the garden animation to work with proper transparency in Phaser.
+
+Clips are listed in spritesheet_jobs.json (input, output, texture key, fps
+budget, threshold, crop). Unless a job fixes its crop, frames are cropped to
+the union of the keyed alpha bounding boxes of the sampled frames, found in
+the first pass on downsampled frames, with static black bars excluded.
+
+Frames are picked by motion: a first streaming pass measures inter-frame
+motion energy on downsampled grayscale frames, the frame budget is spread
+along the cumulative motion curve, and each kept frame's hold time is
+recorded in the _meta.json "durations" list.
+
+With --temporal-key, frames are keyed by a TemporalKeyer: the static white
+background is keyed once and only blocks that changed are re-keyed.
+
+The second pass is a staged pipeline: a decoder thread crops the selected
+frames, a pool of keying workers removes the background, and the assembler
+copies keyed frames into a preallocated sheet array. Bounded queues between
+the stages cap how many frames are in flight, and each stage's throughput
+is printed at the end.
+
+Usage:
+    python video_to_spritesheet.py [--only KEY ...] [--tiers] [--temporal-key]
+    python video_to_spritesheet.py path/to/video.mp4    # one clip, auto-cropped
 """
 
-import imageio.v3 as iio
-import numpy as np
-from PIL import Image
+import argparse
+import json
 import os
-import sys
 import math
+import queue
+import threading
+import time
+import concurrent.futures
 
-def remove_white_background(frame, threshold=230):
+from lazy_import import lazy_import, preload
+from texture_tiers import save_tiers
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+# The first pass (motion, alpha bounds) samples every Nth pixel
+MOTION_STEP = 8
+# Sampled columns / rows never brighter than this over a clip are letterbox bars
+BAR_LUMA = 32
+# Share of the sampling weight spread evenly over time, so still stretches keep some frames
+MOTION_FLOOR = 0.25
+# Frames allowed to wait in each pipeline queue, per keying worker
+QUEUE_DEPTH = 2
+
+def iter_frames(input_path):
+    """Streams decoded RGB frames (PyAV plugin, falling back to imageio's default reader)."""
+    import imageio.v3 as iio
+
+    count = 0
+    try:
+        for frame in iio.imiter(input_path, plugin='pyav'):
+            count += 1
+            yield frame
+        return
+    except Exception as e:
+        if count:
+            raise
+        print(f"Error reading video: {e}")
+        print("Trying fallback reader...")
+    yield from iio.imiter(input_path)
+
+def source_fps(input_path, default=24.0):
+    import imageio.v3 as iio
+
+    try:
+        return float(iio.immeta(input_path, plugin='pyav').get('fps') or default)
+    except Exception:
+        return default
+
+def crop_box(size, ratios):
     """
-    Remove white/near-white pixels from a frame using advanced detection.
-    Returns RGBA image with transparent background.
+    Fixed crop (x, y, w, h) from ratios of the frame size: (left, width) keeps
+    the full height, (left, top, width, height) selects a region.
     """
-    # Convert to PIL Image
-    img = Image.fromarray(frame)
-    img = img.convert('RGBA')
-    data = np.array(img).astype(np.float32)
-    
-    r, g, b, a = data[:,:,0], data[:,:,1], data[:,:,2], data[:,:,3]
+    width, height = size
+    if len(ratios) == 2:
+        return int(width * ratios[0]), 0, int(width * ratios[1]), height
+    left, top, w, h = ratios
+    return int(width * left), int(height * top), int(width * w), int(height * h)
+
+def scan_video(input_path, threshold=230, crop_ratios=None):
+    """
+    First pass over every frame, sampled at every MOTION_STEP-th pixel; frames
+    are not kept. Collects per frame the motion energy (mean absolute luma
+    change to the previous frame, over the fixed crop if `crop_ratios` is
+    given, else the whole frame; energies[0] is 0) and the sampled mask of
+    keyed (non-white) pixels, plus the brightest luma of each sampled column
+    and row over the clip, which finds static black bars.
+    """
+    luma = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    scan = {"energies": [], "opaque": [], "size": None, "columnLuma": None, "rowLuma": None}
+    prev = None
+    for frame in iter_frames(input_path):
+        if scan["size"] is None:
+            scan["size"] = (frame.shape[1], frame.shape[0])
+            if crop_ratios:
+                crop_x, crop_y, crop_w, crop_h = crop_box(scan["size"], crop_ratios)
+        sampled = frame[::MOTION_STEP, ::MOTION_STEP, :3].astype(np.float32)
+        sampled_luma = sampled @ luma
+        if crop_ratios:
+            gray = frame[crop_y:crop_y + crop_h:MOTION_STEP, crop_x:crop_x + crop_w:MOTION_STEP, :3].astype(np.float32) @ luma
+        else:
+            gray = sampled_luma
+        scan["energies"].append(0.0 if prev is None else float(np.abs(gray - prev).mean()))
+        prev = gray
+
+        scan["opaque"].append(key_alpha(np.dstack((sampled, np.full(sampled.shape[:2], 255, np.float32))), threshold) > 0)
+        for key, axis in (("columnLuma", 0), ("rowLuma", 1)):
+            brightest = sampled_luma.max(axis=axis)
+            scan[key] = brightest if scan[key] is None else np.maximum(scan[key], brightest)
+    return scan
+
+def auto_crop(scan, indices):
+    """
+    (x, y, w, h) of the union of the keyed alpha bounding boxes of the frames
+    at `indices`, widened to the sampling grid and clamped to the picture area
+    (black bars stay opaque after white keying, so they are excluded).
+    None if those frames have no keyed pixels.
+    """
+    step = MOTION_STEP
+    width, height = scan["size"]
+    picture = [np.nonzero(scan[key] > BAR_LUMA)[0] for key in ("columnLuma", "rowLuma")]
+    if not all(len(p) for p in picture):
+        return None
+    (col_lo, col_hi), (row_lo, row_hi) = [(int(p[0]), int(p[-1])) for p in picture]
+    occupied = np.logical_or.reduce([scan["opaque"][i] for i in indices])
+    occupied = occupied[row_lo:row_hi + 1, col_lo:col_hi + 1]
+    bounds = []
+    for axis, lo, hi, size in ((0, col_lo, col_hi, width), (1, row_lo, row_hi, height)):
+        samples = np.nonzero(occupied.any(axis=axis))[0] + lo
+        if not len(samples):
+            return None
+        # Content lies strictly between the neighbouring unoccupied samples
+        start = max((int(samples[0]) - 1) * step + 1, lo * step)
+        end = min((int(samples[-1]) + 1) * step, hi * step + 1, size)
+        bounds.append((start, end - start))
+    (x, w), (y, h) = bounds
+    return x, y, w, h
+
+def select_frames(energies, budget):
+    """
+    Picks `budget` frame indices (every frame if the clip is shorter) evenly
+    along the cumulative motion curve (plus a uniform time floor), so fast
+    motion gets more frames than slow.
+    """
+    total_frames = len(energies)
+    if total_frames <= budget:
+        return list(range(total_frames))
+    energy = np.asarray(energies, dtype=np.float64)
+    weights = energy + MOTION_FLOOR * max(energy.mean(), 1e-6)
+    cumulative = np.cumsum(weights) - weights[0]
+    targets = np.linspace(0, cumulative[-1], budget, endpoint=False)
+    picked = set(np.searchsorted(cumulative, targets, side='left').tolist())
+
+    # Targets less than a frame apart land on one index; split the widest gaps
+    # (by motion) until the budget is filled, so the sheet has no blank cells
+    bounds = np.append(cumulative, cumulative[-1] + weights[-1])
+    while len(picked) < budget:
+        order = sorted(picked) + [total_frames]
+        a, b = max(((a, b) for a, b in zip(order, order[1:]) if b - a > 1),
+                   key=lambda gap: bounds[gap[1]] - bounds[gap[0]])
+        middle = int(np.searchsorted(cumulative, (bounds[a] + bounds[b]) / 2))
+        picked.add(min(max(middle, a + 1), b - 1))
+    return sorted(picked)
+
+def frame_durations(indices, end, loop_ms):
+    """
+    Per-frame hold times in ms. Each kept frame lasts until the next kept one
+    (the last until source frame `end`), scaled so the loop takes `loop_ms`.
+    """
+    gaps = np.diff(list(indices) + [end]).astype(np.float64)
+    return [round(float(d), 1) for d in gaps / gaps.sum() * loop_ms]
+
+def key_alpha(data, threshold=230):
+    """
+    Alpha channel (uint8) of float32 RGBA pixels (..., 4) after removing
+    white/near-white, with a faded edge band below the threshold.
+    """
+    r, g, b, a = data[..., 0], data[..., 1], data[..., 2], data[..., 3].copy()
     
     # Method 1: High threshold for pure white
     pure_white_mask = (r > threshold) & (g > threshold) & (b > threshold)
@@ -43,25 +207,240 @@ def remove_white_background(frame, threshold=230):
     edge_mask = edge_luminance_mask & low_variance_mask & ~white_mask
     
     # Apply full transparency to white pixels
-    data[white_mask, 3] = 0
+    a[white_mask] = 0
     
     # Apply partial transparency to edge pixels (fade them out)
     if np.any(edge_mask):
         fade_factor = (threshold - luminance[edge_mask]) / 30.0
-        data[edge_mask, 3] = data[edge_mask, 3] * np.clip(fade_factor, 0, 1)
+        a[edge_mask] = a[edge_mask] * np.clip(fade_factor, 0, 1)
     
-    return Image.fromarray(data.astype(np.uint8))
+    return a.astype(np.uint8)
 
-def video_to_spritesheet(input_path, output_path=None, frame_skip=2, max_frames=30, cols=8, threshold=230):
+def remove_white_background(frame, threshold=230):
+    """
+    Remove white/near-white pixels from a frame using advanced detection.
+    Returns RGBA image with transparent background.
+    """
+    # Convert to PIL Image
+    img = Image.fromarray(frame)
+    img = img.convert('RGBA')
+    data = np.array(img)
+    data[:, :, 3] = key_alpha(data.astype(np.float32), threshold)
+    return Image.fromarray(data)
+
+class TemporalKeyer:
+    """
+    remove_white_background for a frame sequence over a static background.
+    The first frame is keyed in full and becomes the reference; for later
+    frames, only BLOCK x BLOCK blocks whose pixels moved more than `tolerance`
+    (max per-channel difference) from the reference are re-keyed, and the
+    reference is updated there. All other blocks carry their alpha over, so
+    keying cost follows the amount of motion rather than the frame size.
+    Carried blocks differ from the reference by at most `tolerance`, which
+    keeps codec noise on the background from forcing re-keys without letting
+    drift accumulate.
+    """
+
+    BLOCK = 16
+
+    def __init__(self, threshold=230, tolerance=4):
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.reference = None
+        self.alpha = None
+        self.keyed_blocks = 0
+        self.total_blocks = 0
+
+    def blocks(self, pixels):
+        """(blocks_y, blocks_x, BLOCK, BLOCK, ...) view of a padded array."""
+        n = self.BLOCK
+        by, bx = pixels.shape[0] // n, pixels.shape[1] // n
+        return pixels.reshape(by, n, bx, n, *pixels.shape[2:]).swapaxes(1, 2)
+
+    def key(self, frame):
+        """Keys one RGB frame; returns an RGBA image like remove_white_background."""
+        h, w = frame.shape[:2]
+        n = self.BLOCK
+        if self.reference is None or self.reference.shape[:2] != (-(-h // n) * n, -(-w // n) * n):
+            # Background model: full key of the first frame, zero-padded to whole blocks
+            self.reference = np.zeros((-(-h // n) * n, -(-w // n) * n, 3), dtype=np.uint8)
+            self.reference[:h, :w] = frame[:, :, :3]
+            self.alpha = key_alpha(np.dstack((self.reference, np.full(self.reference.shape[:2], 255, np.uint8)))
+                                   .astype(np.float32), self.threshold)
+            changed_count = self.reference.size // (3 * n * n)
+        else:
+            current = np.zeros_like(self.reference)
+            current[:h, :w] = frame[:, :, :3]
+            # Block diff: max per-channel change against the reference (uint8, no widening)
+            delta = np.maximum(current, self.reference) - np.minimum(current, self.reference)
+            changed = self.blocks(delta).max(axis=(2, 3, 4)) > self.tolerance
+            changed_count = int(changed.sum())
+            if changed_count:
+                pixels = self.blocks(current)[changed]
+                rgba = np.concatenate((pixels, np.full(pixels.shape[:3] + (1,), 255, np.uint8)), axis=-1)
+                # Views into the padded arrays: assignment writes through
+                self.blocks(self.alpha)[changed] = key_alpha(rgba.astype(np.float32), self.threshold)
+                self.blocks(self.reference)[changed] = pixels
+        self.keyed_blocks += changed_count
+        self.total_blocks += self.reference.size // (3 * n * n)
+        return Image.fromarray(np.dstack((frame[:, :, :3], self.alpha[:h, :w])))
+
+class StageStats:
+    """Frames handled and seconds spent working / blocked on queues, per pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, busy=0.0, waiting=0.0, frames=0):
+        with self.lock:
+            self.busy += busy
+            self.waiting += waiting
+            self.frames += frames
+
+    def report(self):
+        rate = self.frames / self.busy if self.busy else 0.0
+        return f"  {self.name:<9} {self.frames:>6} {self.busy:>8.2f}s {self.waiting:>8.2f}s {rate:>9.1f}"
+
+def put_until(q, item, stop):
+    """Blocking put that gives up once `stop` is set (a downstream stage failed)."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def get_until(q, stop):
+    """Blocking get that returns None once `stop` is set and nothing is queued."""
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return None
+
+def key_frames_pipeline(input_path, frame_indices, crop, threshold, cols, temporal_key=False, workers=None):
+    """
+    Decodes, crops to `crop` (x, y, w, h), keys and places the selected frames
+    into one (rows * h, cols * w, 4) array. A decoder thread feeds cropped frames to `workers` keying threads
+    through a bounded queue, and the calling thread assembles keyed frames
+    from a second bounded queue. A TemporalKeyer is stateful and needs frames
+    in order, so temporal keying runs with a single worker.
+    Returns (sheet, frame_count, stats).
+    """
+    workers = 1 if temporal_key else (workers or os.cpu_count() or 1)
+    crop_x, crop_y, frame_w, frame_h = crop
+    rows = math.ceil(len(frame_indices) / cols)
+    sheet = np.zeros((rows * frame_h, cols * frame_w, 4), dtype=np.uint8)
+
+    decoded = queue.Queue(maxsize=QUEUE_DEPTH * workers)
+    keyed = queue.Queue(maxsize=QUEUE_DEPTH * workers)
+    stop = threading.Event()
+    stats = {name: StageStats(name) for name in ("decode", "key", "assemble")}
+    keyer = TemporalKeyer(threshold) if temporal_key else None
+
+    def decode():
+        wanted = set(frame_indices)
+        slot = 0
+        try:
+            start = time.time()
+            for idx, frame in enumerate(iter_frames(input_path)):
+                if idx > frame_indices[-1]:
+                    break
+                if idx not in wanted:
+                    continue
+                # Copy the crop so the full decoded frame is not kept alive in the queue
+                cropped = np.ascontiguousarray(frame[crop_y:crop_y + frame_h, crop_x:crop_x + frame_w])
+                stats["decode"].add(busy=time.time() - start, frames=1)
+                start = time.time()
+                if not put_until(decoded, (slot, cropped), stop):
+                    return
+                stats["decode"].add(waiting=time.time() - start)
+                slot += 1
+                start = time.time()
+        finally:
+            for _ in range(workers):
+                put_until(decoded, None, stop)
+
+    def key():
+        try:
+            while True:
+                start = time.time()
+                item = get_until(decoded, stop)
+                stats["key"].add(waiting=time.time() - start)
+                if item is None:
+                    return
+                slot, frame = item
+                start = time.time()
+                image = keyer.key(frame) if keyer else remove_white_background(frame, threshold)
+                result = np.asarray(image)
+                stats["key"].add(busy=time.time() - start, frames=1)
+                start = time.time()
+                if not put_until(keyed, (slot, result), stop):
+                    return
+                stats["key"].add(waiting=time.time() - start)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            put_until(keyed, None, stop)
+
+    count = 0
+    # Worker threads must not be the first to touch a lazy module (see lazy_import.py)
+    preload("numpy", "PIL.Image")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers + 1) as executor:
+        futures = [executor.submit(decode)] + [executor.submit(key) for _ in range(workers)]
+        try:
+            finished = 0
+            while finished < workers:
+                start = time.time()
+                item = get_until(keyed, stop)
+                stats["assemble"].add(waiting=time.time() - start)
+                if item is None:
+                    if stop.is_set():
+                        break  # a keying worker failed; its error is raised below
+                    finished += 1
+                    continue
+                slot, frame = item
+                start = time.time()
+                x, y = (slot % cols) * frame_w, (slot // cols) * frame_h
+                sheet[y:y + frame_h, x:x + frame_w] = frame
+                count += 1
+                stats["assemble"].add(busy=time.time() - start, frames=1)
+                if count % 10 == 0:
+                    print(f"  Processed {count}/{len(frame_indices)} frames")
+        finally:
+            stop.set()
+        for future in futures:
+            future.result()
+
+    if keyer:
+        print(f"Temporal keying: re-keyed {keyer.keyed_blocks / keyer.total_blocks:.0%} of blocks")
+    return sheet, count, stats
+
+def video_to_spritesheet(input_path, output_path=None, frame_skip=None, max_frames=30, cols=8, threshold=230, tiers=False, fps=12, loop_ms=None, temporal_key=False, crop=None, trim=None, fps_budget=None, key=None):
     """
     Convert video to sprite sheet with transparent background.
     
     Args:
         input_path: Path to input video
         output_path: Path to output sprite sheet PNG
-        frame_skip: Skip every N frames (reduces sprite sheet size)
-        max_frames: Maximum frames to extract
+        frame_skip: Fixed stride (every Nth frame); None samples by motion energy
+        max_frames: Maximum frames to extract (the frame budget)
         threshold: White detection threshold (0-255)
+        tiers: Also write 0.5x / 0.25x sheets (frames stay on exact grid multiples)
+        fps: Suggested playback FPS (stride sampling plays frames uniformly at this rate)
+        loop_ms: Loop length for motion sampling; defaults to the source clip's length
+        temporal_key: Re-key only changed blocks against a background model (TemporalKeyer)
+        crop: Fixed crop ratios for crop_box(); None crops to the keyed content
+        trim: (start, end) seconds of the source to use; None uses the whole clip
+        fps_budget: Frames kept per second of source, capping max_frames
+        key: Phaser texture key, recorded in the metadata
     """
     if not os.path.exists(input_path):
         print(f"Error: Input file not found: {input_path}")
@@ -74,150 +453,207 @@ def video_to_spritesheet(input_path, output_path=None, frame_skip=2, max_frames=
     print(f"Reading video: {input_path}")
     
     try:
-        # Read all frames
-        frames = iio.imread(input_path, plugin='pyav')
+        # Pass 1: motion energy and keyed bounds on sampled pixels (no frames kept)
+        scan = scan_video(input_path, threshold, crop)
     except Exception as e:
-        print(f"Error reading video: {e}")
-        print("Trying fallback reader...")
-        try:
-            frames = list(iio.imiter(input_path))
-        except Exception as e2:
-            print(f"Fallback also failed: {e2}")
-            return None
+        print(f"Failed to read video: {e}")
+        return None
     
-    total_frames = len(frames)
+    energies = scan["energies"]
+    total_frames = len(energies)
     print(f"Total frames in video: {total_frames}")
-    
-    # Sample frames
-    frame_indices = list(range(0, total_frames, frame_skip))[:max_frames]
-    print(f"Extracting {len(frame_indices)} frames...")
-    
-    # Calculate crop dimensions
-    # Crop 26% from left and right to remove more black bars/width
-    # Target is to get closer to the subject
-    
-    # Read first frame to get dimensions
-    first_frame = frames[0]
-    height, width = first_frame.shape[:2]
-    crop_x = int(width * 0.26)
-    crop_w = int(width * 0.48)
-    print(f"Cropping frames: x={crop_x}, w={crop_w} (Original: {width}x{height})")
-    
-    processed_frames = []
-    for i, idx in enumerate(frame_indices):
-        frame = frames[idx]
-        
-        # Crop frame
-        # Array slicing: [y:y+h, x:x+w]
-        cropped_frame = frame[:, crop_x:crop_x+crop_w]
-        
-        # Remove white background
-        processed = remove_white_background(cropped_frame, threshold)
-        processed_frames.append(processed)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(frame_indices)} frames")
-    
-    if not processed_frames:
+    if not total_frames:
         print("No frames extracted!")
         return None
+    width, height = scan["size"]
+    src_fps = source_fps(input_path)
     
-    # Calculate sprite sheet dimensions
-    frame_w, frame_h = processed_frames[0].size
-    num_frames = len(processed_frames)
+    # Source frame range [first, end)
+    first, end = 0, total_frames
+    if trim:
+        first = min(int(trim[0] * src_fps), total_frames - 1)
+        end = max(first + 1, min(int(trim[1] * src_fps), total_frames))
+        print(f"Trimmed to frames {first}-{end - 1} ({trim[0]:g}s-{trim[1]:g}s)")
+    if fps_budget:
+        max_frames = min(max_frames, max(1, math.ceil(fps_budget * (end - first) / src_fps)))
     
+    # Sample frames
+    if frame_skip:
+        frame_indices = list(range(first, end, frame_skip))[:max_frames]
+        loop_ms = len(frame_indices) * 1000.0 / fps
+        durations = frame_durations(frame_indices, min(end, frame_indices[-1] + frame_skip), loop_ms)
+        print(f"Extracting {len(frame_indices)} frames (every {frame_skip})...")
+    else:
+        frame_indices = [first + i for i in select_frames(energies[first:end], max_frames)]
+        loop_ms = loop_ms or (end - first) * 1000.0 / src_fps
+        durations = frame_durations(frame_indices, end, loop_ms)
+        print(f"Extracting {len(frame_indices)} frames (motion-weighted)...")
+    
+    if crop:
+        box = crop_box((width, height), crop)
+    else:
+        box = auto_crop(scan, frame_indices)
+        if box is None:
+            print("Warning: no keyed content found, keeping the full frame")
+            box = (0, 0, width, height)
+    frame_w, frame_h = box[2], box[3]
+    print(f"Cropping frames: x={box[0]}, y={box[1]}, {frame_w}x{frame_h} "
+          f"({'fixed' if crop else 'keyed bounds'}; original: {width}x{height})")
+    
+    # Pass 2: decode again, keying only the selected frames, as a staged pipeline
     # Arrange in a grid (prefer more columns than rows for horizontal scrolling)
-    # With cropped frames (narrower), we might fit more per row, but keeping 8 max is fine
-    cols = min(num_frames, 8)  # Max 8 columns
+    cols = min(len(frame_indices), cols)
+    wall_start = time.time()
+    sheet, num_frames, stats = key_frames_pipeline(
+        input_path, frame_indices, box, threshold, cols, temporal_key
+    )
+    
+    if not num_frames:
+        print("No frames extracted!")
+        return None
+    if num_frames < len(frame_indices):
+        # The decoder ran out early: drop the unfilled trailing cells
+        print(f"Warning: only {num_frames}/{len(frame_indices)} selected frames decoded")
+        cols = min(num_frames, cols)
+        sheet = sheet[:math.ceil(num_frames / cols) * frame_h, :cols * frame_w]
     rows = math.ceil(num_frames / cols)
     
     print(f"Creating sprite sheet: {cols}x{rows} grid, {frame_w}x{frame_h} per frame")
-    
-    # Create sprite sheet
     sheet_w = cols * frame_w
     sheet_h = rows * frame_h
-    spritesheet = Image.new('RGBA', (sheet_w, sheet_h), (0, 0, 0, 0))
-    
-    for i, frame in enumerate(processed_frames):
-        col = i % cols
-        row = i // cols
-        x = col * frame_w
-        y = row * frame_h
-        spritesheet.paste(frame, (x, y))
+    spritesheet = Image.fromarray(sheet)
     
     # Save
+    start = time.time()
     spritesheet.save(output_path, 'PNG')
+    encode_seconds = time.time() - start
     print(f"Sprite sheet saved: {output_path}")
     print(f"Dimensions: {sheet_w}x{sheet_h}")
     print(f"Frame size: {frame_w}x{frame_h}")
     print(f"Frames: {num_frames}")
     print(f"Columns: {cols}, Rows: {rows}")
     
+    print(f"\nPipeline throughput ({time.time() - wall_start:.2f}s wall):")
+    print(f"  {'stage':<9} {'frames':>6} {'busy':>9} {'blocked':>9} {'frames/s':>9}")
+    for stage in stats.values():
+        print(stage.report())
+    print(f"  {'encode':<9} {'-':>6} {encode_seconds:>8.2f}s")
+    
     # Create metadata JSON for Phaser
     meta_path = output_path.replace('.png', '_meta.json')
-    import json
     meta = {
+        **({"key": key} if key else {}),
         "frameWidth": frame_w,
         "frameHeight": frame_h,
         "totalFrames": num_frames,
         "columns": cols,
         "rows": rows,
-        "fps": 12  # Suggested playback FPS
+        "fps": fps,  # Suggested playback FPS
+        "sampling": "stride" if frame_skip else "motion",
+        "sourceFps": src_fps,
+        "sourceFrames": total_frames,
+        "sourceSize": [width, height],
+        # Region of the source frame each sheet frame shows
+        "crop": dict(zip(("x", "y", "width", "height"), box)),
+        "sourceIndices": frame_indices,
+        "loopMs": round(loop_ms, 1),
+        # Hold time (ms) per frame, summing to loopMs
+        "durations": durations,
     }
+    
+    if tiers:
+        # Successive-halving tiers; each tier's frame size is floored so the grid stays exact
+        stem, ext = os.path.splitext(os.path.basename(output_path))
+        tier_list = save_tiers(
+            spritesheet, os.path.dirname(output_path) or '.', stem, ext, skip=(1.0,),
+            size_for=lambda s: (cols * max(1, int(frame_w * s)), rows * max(1, int(frame_h * s))),
+            format='PNG'
+        )
+        meta["tiers"] = [
+            dict(t, frameWidth=t["width"] // cols, frameHeight=t["height"] // rows)
+            for t in tier_list
+        ]
+        for t in meta["tiers"]:
+            print(f"Tier {t['scale']:g}x saved: {t['file']} ({t['frameWidth']}x{t['frameHeight']} per frame)")
     with open(meta_path, 'w') as f:
         json.dump(meta, f, indent=2)
     print(f"Metadata saved: {meta_path}")
     
     return output_path
 
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+JOBS_PATH = os.path.join(PROJECT_ROOT, "spritesheet_jobs.json")
+
+def load_jobs(path=JOBS_PATH):
+    with open(path, 'r') as f:
+        return json.load(f)["jobs"]
+
+def run_job(job, tiers=False, temporal_key=False):
+    """Runs one spritesheet job from the manifest. Returns the sheet path or None."""
+    crop = job.get("crop", "auto")
+    try:
+        return video_to_spritesheet(
+            os.path.join(PROJECT_ROOT, job["input"]),
+            output_path=os.path.join(PROJECT_ROOT, job["output"]),
+            max_frames=job.get("maxFrames", 64),
+            fps_budget=job.get("fps"),
+            fps=job.get("fps", 12),
+            cols=job.get("cols", 8),
+            threshold=job.get("threshold", 230),
+            crop=None if crop == "auto" else tuple(crop),
+            trim=job.get("trim"),
+            loop_ms=job.get("loopMs"),
+            key=job["key"],
+            tiers=tiers,
+            temporal_key=temporal_key
+        )
+    except Exception as e:
+        # A failing decode/keying worker re-raises here; fail this job, not the manifest
+        print(f"Error: {job['key']} failed: {e}")
+        return None
+
 def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Convert white-background videos to spritesheets.")
+    parser.add_argument("video", nargs="?", help="Convert a single video (auto-cropped) instead of the jobs")
+    parser.add_argument("--jobs", default=JOBS_PATH, help="Jobs manifest (default: spritesheet_jobs.json)")
+    parser.add_argument("--only", action="append", help="Run only the job with this key (repeatable)")
+    parser.add_argument("--tiers", action="store_true", help="Also write 0.5x / 0.25x sheets")
+    parser.add_argument("--temporal-key", action="store_true", help="Re-key only changed blocks per frame")
+    args = parser.parse_args()
     
-    # Default: Garden video
-    garden_video = os.path.join(script_dir, "Objects", "Cutscenes", "Garden", "download (31).mp4")
-    garden_output = os.path.join(script_dir, "Objects", "Cutscenes", "Garden", "garden_anim.png")
+    if args.video:
+        video_to_spritesheet(args.video, tiers=args.tiers, temporal_key=args.temporal_key)
+        return
     
-    if len(sys.argv) > 1:
-        garden_video = sys.argv[1]
+    jobs = [job for job in load_jobs(args.jobs) if not args.only or job["key"] in args.only]
+    if not jobs:
+        print(f"No matching jobs in {args.jobs}")
+        return
     
-    if os.path.exists(garden_video):
+    failed = []
+    for job in jobs:
         print("="*60)
-        print("Converting Garden Video to Sprite Sheet")
+        print(f"{job['key']}: {job['input']}")
         print("="*60)
-
-        result = video_to_spritesheet(
-            garden_video,
-            output_path=garden_output,
-            frame_skip=3,  # Every 3rd frame
-            max_frames=100,  # Increased to capture full loop
-            threshold=250   # Higher threshold to remove artifacts
-        )
-        
-        if result:
-            print("\n" + "="*60)
-            print("SUCCESS! To use in Phaser:")
-            print("="*60)
-            print("""
-1. In preload():
-   this.load.spritesheet('garden_anim', 'Objects/Cutscenes/Garden/download (31)_spritesheet.png', {
-       frameWidth: <frameWidth from meta>,
-       frameHeight: <frameHeight from meta>
-   });
-
-2. In create():
+        if not run_job(job, tiers=args.tiers, temporal_key=args.temporal_key):
+            failed.append(job["key"])
+        print()
+    
+    print(f"{len(jobs) - len(failed)}/{len(jobs)} spritesheet(s) written" + (f"; failed: {', '.join(failed)}" if failed else ""))
+    print("""
+To use in Phaser (frame size and hold times come from <output>_meta.json):
+   this.load.spritesheet(meta.key, <output>, { frameWidth: meta.frameWidth, frameHeight: meta.frameHeight });
+   
+   // frame.duration is added on top of 1000 / frameRate
+   const base = Math.min(...meta.durations);
    this.anims.create({
-       key: 'garden_loop',
-       frames: this.anims.generateFrameNumbers('garden_anim', { start: 0, end: <totalFrames-1> }),
-       frameRate: 12,
+       key: `${meta.key}_loop`,
+       frames: this.anims.generateFrameNumbers(meta.key, { start: 0, end: meta.totalFrames - 1 })
+           .map((frame, i) => ({ ...frame, duration: meta.durations[i] - base })),
+       frameRate: 1000 / base,
        repeat: -1
    });
-   
-   const garden = this.add.sprite(x, y, 'garden_anim');
-   garden.play('garden_loop');
 """)
-    else:
-        print(f"Video not found: {garden_video}")
-        print("Usage: python video_to_spritesheet.py [path_to_video]")
 
 if __name__ == "__main__":
     main()